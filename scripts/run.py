@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import argparse
 import os
 import subprocess
 import sys
@@ -31,11 +32,80 @@ def run(*args: str) -> None:
     subprocess.check_call(list(args), cwd=str(ROOT))
 
 
-def main() -> int:
-    python_path = ensure_venv()
-    run(str(python_path), "-m", "pip", "install", "-r", "requirements.txt")
-    run(str(python_path), "manage.py", "migrate")
-    run(str(python_path), "manage.py", "runserver", "0.0.0.0:9999")
+def worker_count(value: str) -> int:
+    if value == "auto":
+        # Gunicorn's rule of thumb: two workers per core plus one.
+        return (os.cpu_count() or 1) * 2 + 1
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected a positive integer or 'auto'")
+    if count < 1:
+        raise argparse.ArgumentTypeError("expected a positive integer or 'auto'")
+    return count
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Set up and start ZX9999.")
+    parser.add_argument("--prod", action="store_true", help="Serve with a Gunicorn worker pool instead of runserver.")
+    parser.add_argument("--workers", type=worker_count, default="auto", help="Worker processes, or 'auto' (default).")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per WSGI worker (default 4).")
+    parser.add_argument("--bind", default="0.0.0.0:9999", help="Address to listen on (default 0.0.0.0:9999).")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Seconds workers get to finish on shutdown.")
+    parser.add_argument("--no-venv", action="store_true", help="Use the current interpreter (e.g. in Docker).")
+    return parser.parse_args(argv)
+
+
+def gunicorn_command(python_path: Path, args: argparse.Namespace) -> list[str]:
+    command = [
+        str(python_path),
+        "-m",
+        "gunicorn",
+        "--config",
+        str(ROOT / "zx9999" / "gunicorn.conf.py"),
+        "--bind",
+        args.bind,
+        "--workers",
+        str(args.workers),
+        "--graceful-timeout",
+        str(args.graceful_timeout),
+        # Load Django once in the master so forked workers share it copy-on-write.
+        "--preload",
+        # WSGI only: every view and streamed body is synchronous, and under ASGI
+        # Django buffers sync streams whole and runs sync views one at a time.
+        "--worker-class",
+        "gthread",
+        "--threads",
+        str(args.threads),
+        "zx9999.wsgi:application",
+    ]
+    return command
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    python_path = Path(sys.executable) if args.no_venv else ensure_venv()
+    if not args.no_venv:
+        run(str(python_path), "-m", "pip", "install", "-r", "requirements.txt")
+    if not args.prod:
+        run(str(python_path), "manage.py", "migrate")
+        run(str(python_path), "manage.py", "runserver", "0.0.0.0:9999")
+        return 0
+
+    if os.name == "nt":
+        print("--prod needs Gunicorn, which does not run on Windows; use WSL or Docker.", file=sys.stderr)
+        return 1
+    if not args.no_venv:
+        run(str(python_path), "-m", "pip", "install", "-r", "requirements-prod.txt")
+    # WAL, persistent connections and IMMEDIATE write transactions; see settings.py.
+    os.environ.setdefault("ZX_DB_PROFILE", "production")
+    run(str(python_path), "manage.py", "migrate", "--noinput")
+    run(str(python_path), "manage.py", "collectstatic", "--noinput")
+    command = gunicorn_command(python_path, args)
+    os.chdir(ROOT)
+    # Replace this process so Gunicorn receives SIGTERM/SIGINT directly and
+    # can drain workers for a graceful shutdown.
+    os.execv(command[0], command)
     return 0
 
 
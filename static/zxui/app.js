@@ -14,6 +14,7 @@
   const copyButton = document.getElementById('copy-command');
   const librarySearchInput = document.getElementById('library-search');
   const categoryFilter = document.getElementById('category-filter');
+  const tagFilter = document.getElementById('tag-filter');
 
   const editCommandSelect = document.getElementById('edit-command-select');
   const editToolSelect = document.getElementById('edit-tool-select');
@@ -44,16 +45,168 @@
 
   const normalize = (value) => (value || '').toString().toLowerCase().trim();
 
+  const debounce = (callback, wait) => {
+    let timer = 0;
+    return (...args) => {
+      clearTimeout(timer);
+      timer = setTimeout(() => callback(...args), wait);
+    };
+  };
+
+  const searchDebounceMs = 120;
+
+  const createSearchClient = () => {
+    const workerUrl = document.body?.dataset.searchWorker;
+    if (!workerUrl || typeof Worker === 'undefined') {
+      return null;
+    }
+    let worker;
+    try {
+      worker = new Worker(workerUrl);
+    } catch (error) {
+      return null;
+    }
+    const latest = new Map();
+    let seq = 0;
+    let available = true;
+    // A script that fails to load (CSP, stale hashed URL) or crashes turns the
+    // worker off; pending and later queries resolve undefined so callers fall
+    // back to filtering on the main thread.
+    const fail = () => {
+      if (!available) {
+        return;
+      }
+      available = false;
+      worker.terminate();
+      latest.forEach((request) => request.resolve(undefined));
+      latest.clear();
+    };
+    worker.addEventListener('error', fail);
+    worker.addEventListener('messageerror', fail);
+    worker.addEventListener('message', (event) => {
+      const request = latest.get(event.data.corpus);
+      if (!request || request.seq !== event.data.seq) {
+        return;
+      }
+      latest.delete(event.data.corpus);
+      request.resolve(new Set(event.data.ids));
+    });
+    return {
+      get available() {
+        return available;
+      },
+      index(corpus, documents, append = false) {
+        if (available) {
+          worker.postMessage({ type: append ? 'add' : 'index', corpus, documents });
+        }
+      },
+      // Resolves with the matching ids, null once a newer query replaced it,
+      // or undefined when the worker is unavailable.
+      query(corpus, term) {
+        if (!available) {
+          return Promise.resolve(undefined);
+        }
+        latest.get(corpus)?.resolve(null);
+        seq += 1;
+        const request = { seq };
+        const result = new Promise((resolve) => {
+          request.resolve = resolve;
+        });
+        latest.set(corpus, request);
+        worker.postMessage({ type: 'query', corpus, seq, term });
+        return result;
+      },
+    };
+  };
+
+  const searchClient = createSearchClient();
+
   const getToolById = (toolId) => toolsData.find((tool) => tool.id === toolId);
 
-  const getCommandById = (commandId) => {
-    for (const tool of toolsData) {
-      const command = tool.commands.find((entry) => entry.id === commandId);
-      if (command) {
-        return { ...command, toolId: tool.id, toolName: tool.name };
+  const commandIndex = new Map();
+
+  const indexToolCommands = (tool) => {
+    (tool.commands || []).forEach((command) => {
+      commandIndex.set(command.id, { ...command, toolId: tool.id, toolName: tool.name });
+    });
+  };
+
+  toolsData.forEach(indexToolCommands);
+
+  const commandHaystack = (command) =>
+    [command.name, command.description, command.template, command.category, (command.tags || []).join(' ')]
+      .join(' ')
+      .toLowerCase();
+
+  const commandSearchDocuments = (tools) =>
+    tools.flatMap((tool) =>
+      (tool.commands || []).map((command) => ({ id: command.id, text: commandHaystack(command) })),
+    );
+
+  const composerSearch = toolSelect && commandSelect ? searchClient : null;
+  if (composerSearch) {
+    composerSearch.index('commands', commandSearchDocuments(toolsData));
+  }
+
+  const getCommandById = (commandId) => commandIndex.get(commandId) || null;
+
+  const lazyCommandsUrl = toolSelect?.dataset.commandsUrl || '';
+  const lazyCommandFields = 'id,name,description,template,category,tags,placeholders';
+  const pendingToolLoads = new Map();
+
+  const fetchToolCommands = async (tool) => {
+    const commands = [];
+    let cursor = '';
+    do {
+      const params = new URLSearchParams({ fields: lazyCommandFields, limit: '500' });
+      if (cursor) {
+        params.set('cursor', cursor);
+      }
+      const response = await fetch(`${lazyCommandsUrl}${tool.id}/commands/?${params}`, {
+        headers: { Accept: 'application/json' },
+      });
+      if (!response.ok) {
+        throw new Error(`Could not load commands for ${tool.name}`);
       }
+      const page = await response.json();
+      commands.push(...page.results);
+      cursor = page.next_cursor || '';
+    } while (cursor);
+    return commands;
+  };
+
+  const loadToolCommands = (tool) => {
+    if (!tool || tool.commands) {
+      return Promise.resolve(tool);
+    }
+    if (!pendingToolLoads.has(tool.id)) {
+      const load = fetchToolCommands(tool)
+        .then((commands) => {
+          tool.commands = commands;
+          indexToolCommands(tool);
+          if (composerSearch) {
+            composerSearch.index('commands', commandSearchDocuments([tool]), true);
+          }
+          return tool;
+        })
+        .finally(() => {
+          pendingToolLoads.delete(tool.id);
+        });
+      pendingToolLoads.set(tool.id, load);
+    }
+    return pendingToolLoads.get(tool.id);
+  };
+
+  const scheduleIdle = window.requestIdleCallback || ((callback) => setTimeout(callback, 200));
+
+  const prefetchNextTool = (tool) => {
+    const index = toolsData.indexOf(tool);
+    const nextTool = index >= 0 ? toolsData[index + 1] : null;
+    if (nextTool && !nextTool.commands) {
+      scheduleIdle(() => {
+        loadToolCommands(nextTool).catch(() => {});
+      });
     }
-    return null;
   };
 
   const createOption = (value, label) => {
@@ -63,23 +216,44 @@
     return option;
   };
 
-  const filterCommands = (commands, searchTerm) => {
+  const filterCommands = async (commands, searchTerm) => {
     const term = normalize(searchTerm);
     if (!term) {
       return commands;
     }
-    return commands.filter((command) => {
-      const haystack = [
-        command.name,
-        command.description,
-        command.template,
-        command.category,
-        (command.tags || []).join(' '),
-      ]
-        .join(' ')
-        .toLowerCase();
-      return haystack.includes(term);
+    if (composerSearch?.available) {
+      const ids = await composerSearch.query('commands', term);
+      if (ids !== undefined) {
+        return ids && commands.filter((command) => ids.has(command.id));
+      }
+    }
+    return commands.filter((command) => commandHaystack(command).includes(term));
+  };
+
+  const selectOptionCache = new WeakMap();
+
+  // Reorder, reuse, and trim existing <option> nodes instead of rebuilding.
+  const syncSelectOptions = (select, items) => {
+    let cache = selectOptionCache.get(select);
+    if (!cache) {
+      cache = new Map();
+      selectOptionCache.set(select, cache);
+    }
+    items.forEach((item, index) => {
+      const value = String(item.id);
+      let option = cache.get(value);
+      if (!option) {
+        option = createOption(value, item.name);
+        cache.set(value, option);
+      } else if (option.textContent !== item.name) {
+        option.textContent = item.name;
+      }
+      const current = select.options[index];
+      if (current !== option) {
+        select.insertBefore(option, current || null);
+      }
     });
+    select.options.length = items.length;
   };
 
   const populateTools = () => {
@@ -98,30 +272,26 @@
     });
   };
 
-  const populateCommands = (tool, searchTerm = '') => {
+  const setCommandPlaceholder = (label) => {
+    commandSelect.innerHTML = '';
+    commandSelect.appendChild(createOption('', label));
+    commandSelect.disabled = true;
+  };
+
+  const populateCommands = (tool, filtered) => {
     if (!commandSelect) {
       return [];
     }
-    commandSelect.innerHTML = '';
-    const commands = tool ? tool.commands : [];
-    const filtered = filterCommands(commands, searchTerm);
     if (!tool || !filtered.length) {
-      commandSelect.appendChild(createOption('', 'No commands available'));
-      commandSelect.disabled = true;
+      setCommandPlaceholder('No commands available');
       return [];
     }
     commandSelect.disabled = false;
-    filtered.forEach((command) => {
-      commandSelect.appendChild(createOption(command.id, command.name));
-    });
+    syncSelectOptions(commandSelect, filtered);
     return filtered;
   };
 
-  const renderParameterFields = (template) => {
-    if (!paramFields) {
-      return [];
-    }
-    paramFields.innerHTML = '';
+  const extractPlaceholders = (template) => {
     const tokens = [];
     const seen = new Set();
     const regex = /\{([a-zA-Z0-9_]+)\}/g;
@@ -134,6 +304,18 @@
       }
       match = regex.exec(template);
     }
+    return tokens;
+  };
+
+  const renderParameterFields = (command) => {
+    if (!paramFields) {
+      return [];
+    }
+    paramFields.innerHTML = '';
+    // The server ships each command's placeholder list; parse only as a fallback.
+    const tokens = command
+      ? command.placeholders || extractPlaceholders(command.template)
+      : [];
     if (!tokens.length) {
       const note = document.createElement('div');
       note.className = 'notice';
@@ -209,7 +391,7 @@
       if (commandDescription) {
         commandDescription.textContent = '';
       }
-      renderParameterFields('');
+      renderParameterFields(null);
       updateCommandOutput();
       return;
     }
@@ -230,7 +412,7 @@
     if (commandDescription) {
       commandDescription.textContent = command.description || '';
     }
-    renderParameterFields(command.template);
+    renderParameterFields(command);
     updateCommandOutput();
   };
 
@@ -239,6 +421,39 @@
     return toolId ? getToolById(toolId) : null;
   };
 
+  let showGeneration = 0;
+
+  const showToolCommands = async (tool) => {
+    showGeneration += 1;
+    const current = showGeneration;
+    if (tool && !tool.commands) {
+      setCommandPlaceholder('Loading commands...');
+      updateCommandPreview();
+      try {
+        await loadToolCommands(tool);
+      } catch (error) {
+        setCommandPlaceholder('Could not load commands');
+        return;
+      }
+      if (getActiveTool() !== tool) {
+        return;
+      }
+    }
+    const filtered = await filterCommands(tool ? tool.commands || [] : [], commandSearchInput?.value);
+    // A newer tool change or search replaced this one while it was running.
+    if (!filtered || current !== showGeneration) {
+      return;
+    }
+    const commands = populateCommands(tool, filtered);
+    if (commands[0]) {
+      commandSelect.value = commands[0].id;
+    }
+    updateCommandPreview();
+    if (tool) {
+      prefetchNextTool(tool);
+    }
+  };
+
   const initializeComposer = () => {
     if (!toolSelect || !commandSelect) {
       return;
@@ -248,35 +463,22 @@
     const firstTool = toolsData[0];
     if (firstTool) {
       toolSelect.value = firstTool.id;
-      const commands = populateCommands(firstTool, commandSearchInput?.value);
-      if (commands[0]) {
-        commandSelect.value = commands[0].id;
-      }
     }
-
-    updateCommandPreview();
+    showToolCommands(firstTool || null);
 
     toolSelect.addEventListener('change', () => {
-      const toolId = toNumber(toolSelect.value);
-      const tool = toolId ? getToolById(toolId) : null;
-      const commands = populateCommands(tool, commandSearchInput?.value);
-      if (commands[0]) {
-        commandSelect.value = commands[0].id;
-      }
-      updateCommandPreview();
+      showToolCommands(getActiveTool());
     });
 
     commandSelect.addEventListener('change', updateCommandPreview);
 
     if (commandSearchInput) {
-      commandSearchInput.addEventListener('input', () => {
-        const tool = getActiveTool();
-        const commands = populateCommands(tool, commandSearchInput.value);
-        if (commands[0]) {
-          commandSelect.value = commands[0].id;
-        }
-        updateCommandPreview();
-      });
+      commandSearchInput.addEventListener(
+        'input',
+        debounce(() => {
+          showToolCommands(getActiveTool());
+        }, searchDebounceMs),
+      );
     }
 
     if (extraArgsInput) {
@@ -293,7 +495,7 @@
 
     toolsData.forEach((tool) => {
       editToolSelect.appendChild(createOption(tool.id, tool.name));
-      tool.commands.forEach((command) => {
+      (tool.commands || []).forEach((command) => {
         const label = `${tool.name}: ${command.name}`;
         editCommandSelect.appendChild(createOption(command.id, label));
       });
@@ -364,7 +566,7 @@
     }
     const categories = new Set();
     toolsData.forEach((tool) => {
-      tool.commands.forEach((command) => {
+      (tool.commands || []).forEach((command) => {
         if (command.category) {
           categories.add(command.category);
         }
@@ -382,6 +584,7 @@
   const applyLibraryFilters = () => {
     const term = normalize(librarySearchInput?.value);
     const category = normalize(categoryFilter?.value);
+    const tag = normalize(tagFilter?.value);
     const cards = document.querySelectorAll('.tool-card');
 
     cards.forEach((card) => {
@@ -402,7 +605,8 @@
         const matchesSearch = toolMatches || (!term ? true : commandText.includes(term));
         const itemCategory = normalize(item.dataset.commandCategory);
         const matchesCategory = !category || itemCategory === category;
-        const visible = matchesSearch && matchesCategory;
+        const matchesTag = !tag || (item.dataset.commandTags || '').split(',').map(normalize).includes(tag);
+        const visible = matchesSearch && matchesCategory && matchesTag;
         item.style.display = visible ? '' : 'none';
         if (visible) {
           visibleCount += 1;
@@ -411,26 +615,294 @@
 
       const mutedItem = card.querySelector('li.muted');
       if (mutedItem) {
-        mutedItem.style.display = toolMatches && !category ? '' : 'none';
+        mutedItem.style.display = toolMatches && !category && !tag ? '' : 'none';
       }
 
       const shouldShow =
-        visibleCount > 0 || (toolMatches && !category && commandItems.length === 0);
+        visibleCount > 0 || (toolMatches && !category && !tag && commandItems.length === 0);
       card.style.display = shouldShow ? '' : 'none';
     });
   };
 
+  const libraryRowHeights = { tool: 56, command: 68, empty: 40 };
+  const libraryOverscan = 400;
+
+  const buildLibraryIndex = () => {
+    const entries = [];
+    toolsData.forEach((tool) => {
+      const toolName = normalize(tool.name);
+      const commands = tool.commands || [];
+      if (!commands.length) {
+        entries.push({ tool, toolName, command: null });
+        return;
+      }
+      commands.forEach((command) => {
+        entries.push({
+          tool,
+          toolName,
+          command,
+          haystack: [command.name, command.template, command.description, (command.tags || []).join(', ')]
+            .join(' ')
+            .toLowerCase(),
+          category: normalize(command.category),
+          tagKeys: new Set((command.tags || []).map(normalize)),
+        });
+      });
+    });
+    return entries;
+  };
+
+  const libraryFacetMatches = (entry, category, tag) =>
+    (!category && !tag) ||
+    (entry.command !== null &&
+      (!category || entry.category === category) &&
+      (!tag || entry.tagKeys.has(tag)));
+
+  const libraryEntryMatches = (entry, term, category, tag) =>
+    libraryFacetMatches(entry, category, tag) &&
+    (entry.toolName.includes(term) || (entry.command !== null && entry.haystack.includes(term)));
+
+  const createLibraryRow = (row) => {
+    const element = document.createElement('div');
+    element.className = `library-row ${row.type}-row`;
+    element.style.top = `${row.top}px`;
+    if (row.type === 'tool') {
+      const title = document.createElement('div');
+      title.className = 'tool-title';
+      title.textContent = row.tool.name;
+      const count = document.createElement('div');
+      count.className = 'tool-count';
+      count.textContent = `${(row.tool.commands || []).length} commands`;
+      element.append(title, count);
+      if (row.tool.description) {
+        const description = document.createElement('div');
+        description.className = 'tool-desc';
+        description.textContent = row.tool.description;
+        description.title = row.tool.description;
+        title.after(description);
+      }
+      return element;
+    }
+    if (row.type === 'empty') {
+      element.classList.add('muted');
+      element.textContent = 'No commands yet.';
+      return element;
+    }
+    const { command } = row;
+    const name = document.createElement('span');
+    name.className = 'command-name';
+    name.textContent = command.name;
+    const template = document.createElement('span');
+    template.className = 'command-template';
+    template.textContent = command.template;
+    template.title = command.template;
+    element.append(name, template);
+    const tags = (command.tags || []).join(', ');
+    if (command.category || tags) {
+      const meta = document.createElement('span');
+      meta.className = 'command-meta';
+      const parts = [];
+      if (command.category) {
+        parts.push(`Category: ${command.category}`);
+      }
+      if (tags) {
+        parts.push(`Tags: ${tags}`);
+      }
+      meta.textContent = parts.join(' · ');
+      element.append(meta);
+    }
+    return element;
+  };
+
+  const initializeVirtualLibrary = (viewport) => {
+    const spacer = viewport.querySelector('.library-spacer');
+    const entries = buildLibraryIndex();
+    let matches = entries;
+    let lastTerm = '';
+    let lastFacets = '';
+    let rows = [];
+    let renderedRange = '';
+    let frame = 0;
+
+    const layoutRows = () => {
+      rows = [];
+      let top = 0;
+      let currentTool = null;
+      matches.forEach((entry) => {
+        if (entry.tool !== currentTool) {
+          currentTool = entry.tool;
+          rows.push({ type: 'tool', tool: entry.tool, top });
+          top += libraryRowHeights.tool;
+        }
+        if (entry.command) {
+          rows.push({ type: 'command', command: entry.command, top });
+          top += libraryRowHeights.command;
+        } else {
+          rows.push({ type: 'empty', top });
+          top += libraryRowHeights.empty;
+        }
+      });
+      spacer.style.height = `${top}px`;
+      renderedRange = '';
+    };
+
+    const firstRowAt = (offset) => {
+      let low = 0;
+      let high = rows.length - 1;
+      while (low < high) {
+        const middle = (low + high + 1) >> 1;
+        if (rows[middle].top <= offset) {
+          low = middle;
+        } else {
+          high = middle - 1;
+        }
+      }
+      return Math.max(0, low);
+    };
+
+    const renderRows = () => {
+      frame = 0;
+      const top = viewport.scrollTop - libraryOverscan;
+      const bottom = viewport.scrollTop + viewport.clientHeight + libraryOverscan;
+      const start = rows.length ? firstRowAt(top) : 0;
+      let end = start;
+      while (end < rows.length && rows[end].top < bottom) {
+        end += 1;
+      }
+      const range = `${start}:${end}`;
+      if (range === renderedRange) {
+        return;
+      }
+      renderedRange = range;
+      const fragment = document.createDocumentFragment();
+      for (let index = start; index < end; index += 1) {
+        fragment.appendChild(createLibraryRow(rows[index]));
+      }
+      spacer.replaceChildren(fragment);
+    };
+
+    const scheduleRender = () => {
+      if (!frame) {
+        frame = requestAnimationFrame(renderRows);
+      }
+    };
+
+    if (searchClient) {
+      // The NUL separator keeps a term from matching across tool name and command text.
+      searchClient.index(
+        'library',
+        entries.map((entry, index) => ({
+          id: index,
+          text: entry.command ? `${entry.toolName}\u0000${entry.haystack}` : entry.toolName,
+        })),
+      );
+    }
+
+    let generation = 0;
+
+    const applyFilters = async () => {
+      generation += 1;
+      const current = generation;
+      const term = normalize(librarySearchInput?.value);
+      const category = normalize(categoryFilter?.value);
+      const tag = normalize(tagFilter?.value);
+      const facets = `${category}\u0000${tag}`;
+      const ids = term && searchClient?.available ? await searchClient.query('library', term) : undefined;
+      if (ids === null || current !== generation) {
+        return;
+      }
+      if (ids) {
+        matches = entries.filter((entry, index) => ids.has(index) && libraryFacetMatches(entry, category, tag));
+      } else {
+        // Matches only shrink while the term grows, so narrow the last result
+        // instead of rescanning every entry.
+        const candidates = facets === lastFacets && term.startsWith(lastTerm) ? matches : entries;
+        matches = candidates.filter((entry) => libraryEntryMatches(entry, term, category, tag));
+      }
+      lastTerm = term;
+      lastFacets = facets;
+      layoutRows();
+      viewport.scrollTop = 0;
+      renderRows();
+    };
+
+    if (librarySearchInput) {
+      librarySearchInput.addEventListener('input', debounce(applyFilters, searchDebounceMs));
+    }
+    [categoryFilter, tagFilter].forEach((select) => {
+      select?.addEventListener('change', applyFilters);
+    });
+    viewport.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', scheduleRender);
+    layoutRows();
+    renderRows();
+  };
+
   const initializeLibraryFilters = () => {
     populateCategoryFilter();
-    if (librarySearchInput) {
-      librarySearchInput.addEventListener('input', applyLibraryFilters);
+    const viewport = document.getElementById('library-viewport');
+    if (viewport) {
+      initializeVirtualLibrary(viewport);
+      return;
     }
-    if (categoryFilter) {
-      categoryFilter.addEventListener('change', applyLibraryFilters);
+    if (librarySearchInput) {
+      librarySearchInput.addEventListener('input', debounce(applyLibraryFilters, searchDebounceMs));
     }
+    [categoryFilter, tagFilter].forEach((select) => {
+      select?.addEventListener('change', applyLibraryFilters);
+    });
     applyLibraryFilters();
   };
 
+  const jobStatusLabels = {
+    queued: 'Queued',
+    running: 'Running',
+    succeeded: 'Succeeded',
+    failed: 'Failed',
+  };
+
+  const pollImportJob = async (item) => {
+    const progress = item.querySelector('[data-job-progress]');
+    const errorLine = item.querySelector('[data-job-error]');
+    try {
+      const response = await fetch(item.dataset.jobUrl, { headers: { Accept: 'application/json' } });
+      if (!response.ok) {
+        return;
+      }
+      const job = await response.json();
+      if (progress) {
+        progress.textContent =
+          `${jobStatusLabels[job.status] || job.status} · ` +
+          `${job.tools_processed} tools / ${job.commands_processed} commands processed · ` +
+          `${job.created_tools} tools, ${job.created_commands} commands created, ` +
+          `${job.updated_commands} updated`;
+      }
+      if (errorLine) {
+        errorLine.textContent = job.error || '';
+      }
+      if (job.status === 'queued' || job.status === 'running') {
+        setTimeout(() => pollImportJob(item), 1000);
+      }
+    } catch (error) {
+      setTimeout(() => pollImportJob(item), 5000);
+    }
+  };
+
+  const initializeImportJobs = () => {
+    document.querySelectorAll('[data-job-url]').forEach((item) => {
+      pollImportJob(item);
+    });
+  };
+
+  const initializeDotwaveToggle = () => {
+    const toggle = document.querySelector('[data-dotwave-toggle]');
+    if (!toggle) return;
+    toggle.addEventListener('click', () => {
+      document.cookie = `zx_dotwave=${toggle.dataset.dotwaveToggle}; path=/; max-age=31536000; SameSite=Lax`;
+      window.location.reload();
+    });
+  };
+
   const revealPanels = () => {
     const panels = document.querySelectorAll('[data-animate]');
     panels.forEach((panel, index) => {
@@ -444,5 +916,7 @@
   initializeEditForm();
   initializeCopy();
   initializeLibraryFilters();
+  initializeImportJobs();
+  initializeDotwaveToggle();
   revealPanels();
 })();
@@ -0,0 +1,86 @@
+// Substring search over preset text. A trigram index narrows each query to
+// the documents sharing the term's rarest trigram before verifying them.
+const corpora = new Map();
+const pending = new Map();
+let scheduled = false;
+
+const createCorpus = () => ({ ids: [], texts: [], grams: new Map() });
+
+const trigramsOf = (text) => {
+  const grams = new Set();
+  for (let index = 0; index + 3 <= text.length; index += 1) {
+    grams.add(text.slice(index, index + 3));
+  }
+  return grams;
+};
+
+const addDocuments = (corpus, documents) => {
+  documents.forEach(({ id, text }) => {
+    const position = corpus.ids.length;
+    corpus.ids.push(id);
+    corpus.texts.push(text);
+    trigramsOf(text).forEach((gram) => {
+      let postings = corpus.grams.get(gram);
+      if (!postings) {
+        postings = [];
+        corpus.grams.set(gram, postings);
+      }
+      postings.push(position);
+    });
+  });
+};
+
+const search = (corpus, term) => {
+  let candidates = null;
+  if (term.length >= 3) {
+    for (const gram of trigramsOf(term)) {
+      const postings = corpus.grams.get(gram);
+      if (!postings) {
+        return [];
+      }
+      if (!candidates || postings.length < candidates.length) {
+        candidates = postings;
+      }
+    }
+  }
+  const ids = [];
+  const positions = candidates || corpus.texts.keys();
+  for (const position of positions) {
+    if (corpus.texts[position].includes(term)) {
+      ids.push(corpus.ids[position]);
+    }
+  }
+  return ids;
+};
+
+// Queries queue up while a long one runs; answer only the newest per corpus.
+const runPending = () => {
+  scheduled = false;
+  pending.forEach(({ corpus: name, seq, term }) => {
+    const corpus = corpora.get(name) || createCorpus();
+    const ids = Float64Array.from(term ? search(corpus, term) : corpus.ids);
+    self.postMessage({ corpus: name, seq, ids }, [ids.buffer]);
+  });
+  pending.clear();
+};
+
+self.addEventListener('message', (event) => {
+  const message = event.data;
+  if (message.type === 'index') {
+    corpora.set(message.corpus, createCorpus());
+  }
+  if (message.type === 'index' || message.type === 'add') {
+    if (!corpora.has(message.corpus)) {
+      corpora.set(message.corpus, createCorpus());
+    }
+    addDocuments(corpora.get(message.corpus), message.documents);
+    return;
+  }
+  if (message.type === 'query') {
+    pending.set(message.corpus, message);
+    if (!scheduled) {
+      scheduled = true;
+      setTimeout(runPending, 0);
+    }
+  }
+});
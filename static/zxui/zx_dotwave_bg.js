@@ -4,6 +4,12 @@
   const ctx = canvas.getContext('2d');
   if (!ctx) return;
 
+  const fps = Number(canvas.dataset.fps) || 30;
+  const frameInterval = 1000 / Math.max(1, fps);
+  // A callback arriving this late means something else held the main thread.
+  const busyGap = Math.max(frameInterval * 3, 100);
+  const reducedMotion = window.matchMedia('(prefers-reduced-motion: reduce)');
+
   const rootStyles = getComputedStyle(document.documentElement);
   const accent = rootStyles.getPropertyValue('--accent').trim() || '#39ff14';
 
@@ -25,6 +31,10 @@
   let time = 0;
   const mouse = { x: -9999, y: -9999 };
   let needsRebuild = true;
+  let frameId = 0;
+  let lastTick = 0;
+  let lastDraw = 0;
+  let drawCost = 0;
 
   function resize() {
     const ratio = window.devicePixelRatio || 1;
@@ -36,6 +46,9 @@
     canvas.style.height = `${height}px`;
     ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
     needsRebuild = true;
+    if (!frameId) {
+      draw();
+    }
   }
 
   function buildGrid() {
@@ -68,11 +81,10 @@
     ctx.fill();
   }
 
-  function animate() {
+  function draw() {
     if (needsRebuild) {
       buildGrid();
     }
-    time += settings.waveSpeed;
 
     ctx.clearRect(0, 0, width, height);
     ctx.fillStyle = settings.dotColor;
@@ -102,14 +114,57 @@
 
     ctx.shadowBlur = 0;
     ctx.globalAlpha = 1;
-    requestAnimationFrame(animate);
+  }
+
+  function tick(now) {
+    frameId = requestAnimationFrame(tick);
+    const gap = now - lastTick;
+    lastTick = now;
+    if (gap > busyGap) {
+      // Resume on the next frame instead of adding work after a long task.
+      lastDraw = now;
+      return;
+    }
+    // Expensive frames stretch the interval so the page keeps its headroom.
+    if (now - lastDraw < Math.max(frameInterval, drawCost * 4)) {
+      return;
+    }
+    const elapsed = Math.min(now - lastDraw, frameInterval * 3);
+    lastDraw = now;
+    time += settings.waveSpeed * (elapsed / (1000 / 60));
+    const started = performance.now();
+    draw();
+    drawCost = drawCost * 0.8 + (performance.now() - started) * 0.2;
+  }
+
+  function start() {
+    if (frameId || document.hidden || reducedMotion.matches) return;
+    lastTick = performance.now();
+    lastDraw = 0;
+    frameId = requestAnimationFrame(tick);
+  }
+
+  function stop() {
+    if (!frameId) return;
+    cancelAnimationFrame(frameId);
+    frameId = 0;
+  }
+
+  function syncRunning() {
+    if (document.hidden || reducedMotion.matches) {
+      stop();
+    } else {
+      start();
+    }
   }
 
   window.addEventListener('resize', resize);
   window.addEventListener('mousemove', updateMouse);
   window.addEventListener('mouseleave', clearMouse);
   window.addEventListener('blur', clearMouse);
+  document.addEventListener('visibilitychange', syncRunning);
+  reducedMotion.addEventListener('change', syncRunning);
 
   resize();
-  requestAnimationFrame(animate);
+  syncRunning();
 })();
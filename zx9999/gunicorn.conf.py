@@ -0,0 +1,62 @@
+# Gunicorn settings used by `python scripts/run.py --prod`; command-line flags take precedence.
+import os
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'zx9999.settings')
+
+timeout = 120
+keepalive = 5
+accesslog = '-'
+
+
+def when_ready(server):
+    # Runs in the master after --preload imported Django and before workers
+    # fork: build the catalog snapshot once so every worker inherits it.
+    from django.conf import settings
+    from django.db import connections
+
+    from zxui.catalog import get_snapshot
+
+    if settings.ZX_METRICS_DIR:
+        # Counters restart with the server; drop the previous run's files.
+        for path in Path(settings.ZX_METRICS_DIR).glob('*.json'):
+            path.unlink(missing_ok=True)
+    try:
+        get_snapshot()
+    except Exception:  # noqa: BLE001 - a cold cache is fine, workers rebuild it.
+        server.log.exception('Could not warm the catalog snapshot')
+    finally:
+        # Never share database connections across fork.
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    from django.conf import settings
+    from django.db import connections
+
+    connections.close_all()
+    if settings.ZX_METRICS_DIR:
+        from zxui.metrics import retire_worker
+
+        # A reused pid must not pick up the counters of an older worker.
+        retire_worker(settings.ZX_METRICS_DIR, worker.pid)
+
+
+def worker_exit(server, worker):
+    # Runs in the worker: write its last counts before the master retires the file.
+    from django.conf import settings
+
+    if settings.ZX_METRICS_DIR:
+        from zxui.metrics import registry
+
+        registry.flush(settings.ZX_METRICS_DIR, interval=0)
+
+
+def child_exit(server, worker):
+    # Runs in the master: keep the exited worker's counts, drop its file.
+    from django.conf import settings
+
+    if settings.ZX_METRICS_DIR:
+        from zxui.metrics import retire_worker
+
+        retire_worker(settings.ZX_METRICS_DIR, worker.pid)
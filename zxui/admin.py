@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import CommandTemplate, Tool
+from .models import CommandTemplate, ImportJob, Tool
 
 
 @admin.register(Tool)
@@ -14,3 +14,10 @@ class CommandTemplateAdmin(admin.ModelAdmin):
     list_display = ('name', 'tool', 'category', 'updated_at')
     list_filter = ('tool', 'category')
     search_fields = ('name', 'template', 'category')
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'source_name', 'status', 'created_commands', 'updated_commands', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('started_at', 'finished_at')
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .generation import combination_count, file_values, iter_generated, parse_values
+from .models import CommandTemplate, Tool
+from .placeholders import filter_by_placeholders
+from .rendering import compile_template
+from .tags import filter_by_tag, tag_facets
+from .transfer import buffered_chunks
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+TOOL_FIELDS = ('id', 'name', 'description', 'command_count', 'created_at', 'updated_at')
+DEFAULT_TOOL_FIELDS = ('id', 'name', 'description', 'command_count')
+COMMAND_FIELDS = (
+    'id',
+    'tool_id',
+    'name',
+    'description',
+    'template',
+    'category',
+    'tags',
+    'placeholders',
+    'created_at',
+    'updated_at',
+)
+# Fields derived in Python from a stored column rather than selected directly.
+COMPUTED_COMMAND_FIELDS = {
+    'placeholders': ('template', lambda row: list(compile_template(row['template']).placeholders)),
+}
+DEFAULT_COMMAND_FIELDS = ('id', 'name', 'description', 'template', 'category', 'tags')
+MAX_RENDERS_PER_CALL = 50000
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _error(message: str, status: int = 400) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+def _parse_page_size(raw) -> int:
+    if raw in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ApiError('limit must be an integer.')
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def _parse_command_id(raw) -> int:
+    # Form fields and JS clients send ids as strings; accept those, reject the rest.
+    if isinstance(raw, bool):
+        raise ApiError('command_id must be an integer.')
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ApiError('command_id must be an integer.')
+
+
+def _parse_fields(raw, allowed, default) -> list[str]:
+    if not raw:
+        return list(default)
+    fields = []
+    for field in raw.split(','):
+        field = field.strip()
+        if not field or field in fields:
+            continue
+        if field not in allowed:
+            raise ApiError(f'Unknown field "{field}". Allowed: {", ".join(allowed)}.')
+        fields.append(field)
+    return fields or list(default)
+
+
+def encode_cursor(name: str, pk: int) -> str:
+    raw = json.dumps([name, pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        name, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise ApiError('Invalid cursor.')
+    if not isinstance(name, str) or not isinstance(pk, int):
+        raise ApiError('Invalid cursor.')
+    return name, pk
+
+
+def _filter_commands(queryset, params, prefix: str = ''):
+    category = params.get('category', '').strip()
+    if category:
+        queryset = queryset.filter(**{f'{prefix}category': category})
+    tag = params.get('tag', '').strip()
+    if tag:
+        queryset = filter_by_tag(queryset, tag, prefix)
+    placeholders = [
+        name.strip() for raw in params.getlist('placeholder') for name in raw.split(',') if name.strip()
+    ]
+    if placeholders:
+        queryset = filter_by_placeholders(queryset, placeholders, prefix)
+    return queryset
+
+
+def _paginate(queryset, params, fields, computed=None):
+    # Keyset pagination on (name, id): stable under inserts and O(page) per request.
+    limit = _parse_page_size(params.get('limit'))
+    cursor = params.get('cursor')
+    if cursor:
+        name, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(name__gt=name) | Q(name=name, id__gt=pk))
+    computed = {field: computed[field] for field in fields if computed and field in computed}
+    columns = [field for field in fields if field not in computed]
+    columns += [source for source, _ in computed.values()]
+    select = list(dict.fromkeys([*columns, 'name', 'id']))
+    rows = list(queryset.order_by('name', 'id').values(*select)[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['name'], rows[-1]['id'])
+    for row in rows:
+        for field, (_, derive) in computed.items():
+            row[field] = derive(row)
+    results = [{field: row[field] for field in fields} for row in rows]
+    return {'results': results, 'next_cursor': next_cursor}
+
+
+def tools_list(request):
+    try:
+        fields = _parse_fields(request.GET.get('fields'), TOOL_FIELDS, DEFAULT_TOOL_FIELDS)
+        queryset = Tool.objects.all()
+        if any(request.GET.get(key, '').strip() for key in ('category', 'tag', 'placeholder')):
+            matching = _filter_commands(CommandTemplate.objects.all(), request.GET)
+            queryset = queryset.filter(id__in=matching.values('tool_id'))
+        page = _paginate(queryset, request.GET, fields)
+    except ApiError as exc:
+        return _error(exc.message, exc.status)
+    return JsonResponse(page)
+
+
+def tool_commands(request, tool_id):
+    if not Tool.objects.filter(id=tool_id).exists():
+        return _error('Tool not found.', status=404)
+    try:
+        fields = _parse_fields(request.GET.get('fields'), COMMAND_FIELDS, DEFAULT_COMMAND_FIELDS)
+        queryset = _filter_commands(CommandTemplate.objects.filter(tool_id=tool_id), request.GET)
+        page = _paginate(queryset, request.GET, fields, COMPUTED_COMMAND_FIELDS)
+    except ApiError as exc:
+        return _error(exc.message, exc.status)
+    return JsonResponse(page)
+
+
+def tags_list(request):
+    # Facet counts over the commands matching the usual filters, e.g. the tags
+    # that co-occur with ?tag=dns or appear in ?category=Recon.
+    try:
+        limit = _parse_page_size(request.GET.get('limit'))
+        commands = None
+        if any(request.GET.get(key, '').strip() for key in ('tool', 'category', 'tag', 'placeholder')):
+            commands = _filter_commands(CommandTemplate.objects.all(), request.GET)
+            tool = request.GET.get('tool', '').strip()
+            if tool:
+                if not tool.isdigit():
+                    raise ApiError('tool must be an integer id.')
+                commands = commands.filter(tool_id=int(tool))
+        rows = tag_facets(commands)[:limit]
+    except ApiError as exc:
+        return _error(exc.message, exc.status)
+    return JsonResponse({'results': [{'name': row['tag__name'], 'count': row['count']} for row in rows]})
+
+
+def _load_json_body(request):
+    try:
+        return json.loads(request.body or b'null')
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('Request body must be JSON.')
+
+
+def _render_request(spec, commands, budget):
+    if not isinstance(spec, dict):
+        raise ApiError('Each render request must be an object.')
+    if 'template' in spec:
+        template = spec['template']
+        if not isinstance(template, str):
+            raise ApiError('template must be a string.')
+    else:
+        command_id = _parse_command_id(spec.get('command_id'))
+        command = commands.get(command_id)
+        if command is None:
+            raise ApiError(f'Unknown command_id {command_id}.', status=404)
+        template = command.template
+    params = spec.get('params', {})
+    param_sets = params if isinstance(params, list) else [params]
+    if not all(isinstance(values, dict) for values in param_sets):
+        raise ApiError('params must be an object or a list of objects.')
+    budget[0] -= len(param_sets)
+    if budget[0] < 0:
+        raise ApiError(f'At most {MAX_RENDERS_PER_CALL} commands can be rendered per call.')
+    extra_args = str(spec.get('extra_args', '') or '')
+    plan = compile_template(template)
+    result = {'placeholders': list(plan.placeholders)}
+    if 'template' not in spec:
+        result['command_id'] = command_id
+    result['commands'] = [plan.render(values, extra_args) for values in param_sets]
+    return result
+
+
+@csrf_exempt
+@require_POST
+def render_commands(request):
+    # Rendering has no side effects, so batch clients may call it without a CSRF token.
+    try:
+        body = _load_json_body(request)
+        if not isinstance(body, dict):
+            raise ApiError('Request body must be a JSON object.')
+        specs = body['requests'] if 'requests' in body else [body]
+        if not isinstance(specs, list):
+            raise ApiError('requests must be a list.')
+        command_ids = {
+            _parse_command_id(spec.get('command_id'))
+            for spec in specs
+            if isinstance(spec, dict) and 'template' not in spec
+        }
+        commands = CommandTemplate.objects.only('template').in_bulk(command_ids)
+        budget = [MAX_RENDERS_PER_CALL]
+        results = [_render_request(spec, commands, budget) for spec in specs]
+    except ApiError as exc:
+        return _error(exc.message, exc.status)
+    if 'requests' in body:
+        return JsonResponse({'results': results})
+    return JsonResponse(results[0])
+
+
+def _generation_spec(request):
+    if request.content_type == 'application/json':
+        body = _load_json_body(request)
+        if not isinstance(body, dict):
+            raise ApiError('Request body must be a JSON object.')
+        params = body.get('params') or {}
+        if not isinstance(params, dict):
+            raise ApiError('params must be an object of placeholder: values.')
+        return body, params, {}
+    params = {
+        key[len('param_') :]: value
+        for key, value in request.POST.items()
+        if key.startswith('param_') and value.strip()
+    }
+    files = {key[len('file_') :]: upload for key, upload in request.FILES.items() if key.startswith('file_')}
+    return request.POST, params, files
+
+
+@csrf_exempt
+@require_POST
+def generate_commands(request):
+    """Stream one rendered command per combination of placeholder values.
+
+    Values come from ``params`` (lists, comma/newline strings, CIDR blocks,
+    numeric ranges) or from uploaded ``file_<placeholder>`` files. Nothing is
+    materialized: combinations are produced lazily while the response streams.
+    """
+    try:
+        spec, params, files = _generation_spec(request)
+        if spec.get('template'):
+            template = str(spec['template'])
+        else:
+            command_id = _parse_command_id(spec.get('command_id'))
+            command = CommandTemplate.objects.filter(pk=command_id).only('template').first()
+            if command is None:
+                raise ApiError('Unknown command_id.', status=404)
+            template = command.template
+        output = spec.get('format') or 'text'
+        if output not in ('text', 'ndjson'):
+            raise ApiError('format must be "text" or "ndjson".')
+        placeholders = compile_template(template).placeholders
+        unknown = sorted((set(params) | set(files)) - set(placeholders))
+        if unknown:
+            raise ApiError(f'Template has no placeholder(s): {", ".join(unknown)}.')
+        sources = {}
+        for key in placeholders:
+            try:
+                if key in files:
+                    sources[key] = file_values(files[key])
+                elif key in params:
+                    sources[key] = parse_values(params[key])
+            except ValueError as exc:
+                raise ApiError(f'{key}: {exc}')
+        total = combination_count(sources.values(), settings.ZX_GENERATE_MAX)
+        if total > settings.ZX_GENERATE_MAX:
+            raise ApiError(f'{total} combinations exceed the limit of {settings.ZX_GENERATE_MAX}.')
+    except ApiError as exc:
+        return _error(exc.message, exc.status)
+    chunks = buffered_chunks(iter_generated(template, sources, str(spec.get('extra_args') or ''), output))
+    response = StreamingHttpResponse(
+        chunks,
+        content_type='application/x-ndjson' if output == 'ndjson' else 'text/plain; charset=utf-8',
+    )
+    response['X-Combination-Count'] = str(total)
+    return response
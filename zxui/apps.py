@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ZxuiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'zxui'
+
+    def ready(self) -> None:
+        from .signals import invalidate_catalog_after_migrate
+
+        post_migrate.connect(invalidate_catalog_after_migrate, sender=self)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.db import connection
+
+# Rows per statement; the backend may lower it to stay under its parameter limit.
+INSERT_BATCH_SIZE = 500
+
+
+def insert_rows(model, columns, rows, conflict: str = '', returning=()) -> list[tuple]:
+    """Multi-row ``INSERT`` of plain tuples, skipping per-object ORM work.
+
+    ``columns`` are field attnames and ``rows`` tuples of already adapted
+    values in that order. ``conflict`` is appended verbatim, e.g.
+    ``ON CONFLICT DO NOTHING``; SQLite (3.35+) and PostgreSQL both accept
+    it, and both return ``returning`` columns for the rows they wrote.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(column) for column in columns]
+    batch_size = min(INSERT_BATCH_SIZE, connection.ops.bulk_batch_size(fields, rows) or INSERT_BATCH_SIZE)
+    head = f'INSERT INTO {quote(model._meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) VALUES '
+    tail = f' {conflict}' if conflict else ''
+    if returning:
+        tail += f' RETURNING {", ".join(quote(model._meta.get_field(name).column) for name in returning)}'
+    placeholder = f'({", ".join(["%s"] * len(fields))})'
+    written = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            cursor.execute(
+                head + ', '.join([placeholder] * len(batch)) + tail,
+                [value for row in batch for value in row],
+            )
+            if returning:
+                written.extend(cursor.fetchall())
+    return written
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+from django.utils.html import json_script
+
+from .models import CommandTemplate, Tool
+from .rendering import compile_template
+from .tags import tag_facets
+
+_lock = threading.Lock()
+_version = 0
+_snapshot: CatalogSnapshot | None = None
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    token: str
+    tools_payload: list
+    tools_script: str
+    tool_list_script: str
+    # Content hash per tool id; changes whenever the tool or any command does.
+    tool_fingerprints: dict
+    tag_facets: list
+
+
+@dataclass(frozen=True)
+class CatalogVersion:
+    tool_count: int
+    command_count: int
+    last_modified: datetime | None
+
+    @property
+    def token(self) -> str:
+        stamp = self.last_modified.isoformat() if self.last_modified else '-'
+        return f'{self.tool_count}.{self.command_count}.{stamp}'
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = parse_datetime(str(value))
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def catalog_version() -> CatalogVersion:
+    """Row counts plus newest updated_at of both tables, in one round trip.
+
+    Counts catch deletes, which can lower the newest timestamp.
+    """
+    tool_table = connection.ops.quote_name(Tool._meta.db_table)
+    command_table = connection.ops.quote_name(CommandTemplate._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT (SELECT COUNT(*) FROM {tool_table}), (SELECT MAX(updated_at) FROM {tool_table}), '
+            f'(SELECT COUNT(*) FROM {command_table}), (SELECT MAX(updated_at) FROM {command_table})'
+        )
+        tool_count, tool_latest, command_count, command_latest = cursor.fetchone()
+    stamps = [stamp for stamp in map(_as_datetime, (tool_latest, command_latest)) if stamp]
+    return CatalogVersion(tool_count, command_count, max(stamps) if stamps else None)
+
+
+def bump_version() -> None:
+    global _version
+    with _lock:
+        _version += 1
+
+
+def command_payload(cmd) -> dict:
+    return {
+        'id': cmd.id,
+        'name': cmd.name,
+        'description': cmd.description,
+        'template': cmd.template,
+        'category': cmd.category,
+        'tags': cmd.tags,
+        'placeholders': list(compile_template(cmd.template).placeholders),
+    }
+
+
+def _build_payload():
+    tools = Tool.objects.prefetch_related('commands').all()
+    tools_payload = []
+    for tool in tools:
+        commands_payload = [command_payload(cmd) for cmd in tool.commands.all()]
+        tools_payload.append(
+            {
+                'id': tool.id,
+                'name': tool.name,
+                'description': tool.description,
+                'commands': commands_payload,
+            }
+        )
+    return tools_payload
+
+
+def _tool_list(tools_payload):
+    return [
+        {
+            'id': tool['id'],
+            'name': tool['name'],
+            'description': tool['description'],
+            'command_count': len(tool['commands']),
+        }
+        for tool in tools_payload
+    ]
+
+
+def _fingerprint(tool_payload) -> str:
+    encoded = json.dumps(tool_payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode()).hexdigest()[:20]
+
+
+def get_snapshot(token: str | None = None) -> CatalogSnapshot:
+    """Return the cached catalog payload, rebuilding it after any write.
+
+    Writes in this process bump the in-process version. Pass the current
+    catalog_version() token to also notice writes made by other worker
+    processes; views that validate ETags already have it at hand.
+    """
+    # The payload is shared between requests: callers must treat it as read-only.
+    global _snapshot
+    snapshot = _snapshot
+    version = _version
+    if snapshot is not None and snapshot.version == version and token in (None, snapshot.token):
+        return snapshot
+    # Read the token before the rows: a write landing mid-build then shows up
+    # as a token mismatch on the next request instead of being masked.
+    built_token = catalog_version().token
+    tools_payload = _build_payload()
+    snapshot = CatalogSnapshot(
+        version=version,
+        token=built_token,
+        tools_payload=tools_payload,
+        tools_script=json_script(tools_payload, 'tools-data'),
+        tool_list_script=json_script(_tool_list(tools_payload), 'tools-data'),
+        tool_fingerprints={tool['id']: _fingerprint(tool) for tool in tools_payload},
+        tag_facets=list(tag_facets()),
+    )
+    with _lock:
+        # A write that landed while we were building makes this snapshot stale;
+        # serve it for this request but let the next one rebuild.
+        if _version == version:
+            _snapshot = snapshot
+    return snapshot
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+DOTWAVE_COOKIE = 'zx_dotwave'
+
+
+def dotwave_enabled(request) -> bool:
+    return settings.ZX_DOTWAVE and request.COOKIES.get(DOTWAVE_COOKIE) != 'off'
+
+
+def dotwave(request):
+    return {
+        'dotwave_available': settings.ZX_DOTWAVE,
+        'dotwave_enabled': dotwave_enabled(request),
+        'dotwave_fps': settings.ZX_DOTWAVE_FPS,
+    }
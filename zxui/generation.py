@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import ipaddress
+import json
+import re
+from itertools import chain
+
+from .rendering import compile_template
+
+_RANGE_RE = re.compile(r'^(\d+)\s*-\s*(\d+)$')
+_SPLIT_RE = re.compile(r'[\n,]')
+
+
+class _Network:
+    """Host addresses of a CIDR block, re-iterable and sized without expanding it."""
+
+    def __init__(self, network) -> None:
+        self.network = network
+
+    def count(self) -> int:
+        network = self.network
+        total = network.num_addresses
+        if network.version == 4 and network.prefixlen <= 30:
+            return total - 2
+        if network.version == 6 and network.prefixlen <= 126:
+            return total - 1
+        return total
+
+    def __iter__(self):
+        return (str(address) for address in self.network.hosts())
+
+
+class _FileLines:
+    """Non-empty lines of an uploaded file, re-read from the start on each pass."""
+
+    def __init__(self, upload) -> None:
+        self.upload = upload
+        self._length = sum(1 for _ in self)
+
+    def count(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        self.upload.seek(0)
+        for raw_line in self.upload:
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            if line:
+                yield line
+
+
+def _segment_count(segment) -> int:
+    if isinstance(segment, range):
+        return segment.stop - segment.start
+    if isinstance(segment, tuple):
+        return len(segment)
+    return segment.count()
+
+
+class ValueSource:
+    def __init__(self, segments) -> None:
+        self.segments = segments
+
+    def count(self) -> int:
+        # Plain ints throughout: len() raises OverflowError past sys.maxsize,
+        # which an IPv6 /64 or a wide numeric range easily reaches.
+        return sum(_segment_count(segment) for segment in self.segments)
+
+    def __iter__(self):
+        return chain.from_iterable(self.segments)
+
+
+def _expand_entry(entry: str):
+    if '/' in entry:
+        try:
+            return _Network(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            pass
+    match = _RANGE_RE.match(entry)
+    if match:
+        start, end = int(match.group(1)), int(match.group(2))
+        if start <= end:
+            return range(start, end + 1)
+    return (entry,)
+
+
+def parse_values(spec) -> ValueSource:
+    """Accept a list of values or a comma/newline separated string.
+
+    Entries may be CIDR blocks (10.0.0.0/24 expands to its hosts) or
+    inclusive numeric ranges (8000-8100); anything else is used verbatim.
+    """
+    if isinstance(spec, str):
+        entries = _SPLIT_RE.split(spec)
+    elif isinstance(spec, list):
+        entries = [str(item) for item in spec]
+    else:
+        raise ValueError('Parameter values must be a string or a list.')
+    return ValueSource([_expand_entry(entry.strip()) for entry in entries if entry.strip()])
+
+
+def file_values(upload) -> ValueSource:
+    return ValueSource([_FileLines(upload)])
+
+
+def combination_count(sources, limit: int | None = None) -> int:
+    """Product of the source sizes; stops early once it passes ``limit``."""
+    total = 1
+    for source in sources:
+        total *= source.count()
+        if limit is not None and total > limit:
+            return total
+    return total
+
+
+def iter_product(sources):
+    """Cartesian product that re-iterates its inputs instead of materializing them.
+
+    itertools.product would first copy every input into a tuple, which is
+    not an option for a /8 or a multi-million line file.
+    """
+    if not sources:
+        yield ()
+        return
+    first, rest = sources[0], sources[1:]
+    for value in first:
+        for tail in iter_product(rest):
+            yield (str(value), *tail)
+
+
+def iter_generated(template: str, sources: dict, extra_args: str = '', output: str = 'text'):
+    plan = compile_template(template)
+    keys = list(sources)
+    for combination in iter_product([sources[key] for key in keys]):
+        values = dict(zip(keys, combination))
+        command = plan.render(values, extra_args)
+        if output == 'ndjson':
+            yield json.dumps({'command': command, 'params': values}) + '\n'
+        else:
+            yield command + '\n'
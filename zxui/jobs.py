@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ImportJob
+from .transfer import ImportResult, import_tool_stream, iter_bundle_entries, open_bundle
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FIELDS = [
+    'tools_processed',
+    'commands_processed',
+    'created_tools',
+    'created_commands',
+    'updated_commands',
+]
+
+_executor_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor | None:
+    global _executor
+    if settings.ZX_IMPORT_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ZX_IMPORT_WORKERS,
+                thread_name_prefix='zx-import',
+            )
+        return _executor
+
+
+def _spool_upload(upload) -> Path:
+    spool_dir = Path(settings.ZX_IMPORT_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f'{uuid.uuid4().hex}.bundle'
+    with path.open('wb') as handle:
+        for chunk in upload.chunks():
+            handle.write(chunk)
+    return path
+
+
+def submit_import(upload, overwrite: bool = False) -> ImportJob:
+    """Queue an uploaded bundle for import and return the job straight away.
+
+    With ZX_IMPORT_WORKERS set to 0 the job stays queued for
+    ``manage.py run_import_jobs``.
+    """
+    path = _spool_upload(upload)
+    job = ImportJob.objects.create(
+        source_name=upload.name[:255],
+        spool_path=str(path),
+        overwrite=overwrite,
+    )
+    executor = _get_executor()
+    if executor is not None:
+        transaction.on_commit(lambda: executor.submit(_run_in_thread, job.pk))
+    return job
+
+
+def _claim(job_id: int) -> bool:
+    # Conditional update so a job is never picked up by two workers.
+    now = timezone.now()
+    return bool(
+        ImportJob.objects.filter(pk=job_id, status=ImportJob.Status.QUEUED).update(
+            status=ImportJob.Status.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+        )
+    )
+
+
+def _save_progress(job_id: int, result: ImportResult, **extra) -> None:
+    values = {field: getattr(result, field) for field in PROGRESS_FIELDS}
+    ImportJob.objects.filter(pk=job_id).update(**values, heartbeat_at=timezone.now(), **extra)
+
+
+def is_stale(job: ImportJob) -> bool:
+    cutoff = timezone.now() - timedelta(seconds=settings.ZX_IMPORT_STALE_SECONDS)
+    if job.status == ImportJob.Status.RUNNING:
+        return (job.heartbeat_at or job.started_at or job.created_at) < cutoff
+    return job.status == ImportJob.Status.QUEUED and job.created_at < cutoff
+
+
+def recover_stale_jobs() -> list[int]:
+    """Requeue jobs whose worker process went away; return the stale queued ids.
+
+    A RUNNING job without a recent heartbeat is queued again while its spooled
+    bundle still exists (batches it already committed are re-applied), and
+    failed otherwise. QUEUED jobs older than the threshold were submitted to
+    an executor that no longer exists.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ZX_IMPORT_STALE_SECONDS)
+    stalled = ImportJob.objects.filter(status=ImportJob.Status.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    for job in stalled:
+        if Path(job.spool_path).exists():
+            # Conditional on the old heartbeat so a live worker that just
+            # reported progress keeps its job.
+            ImportJob.objects.filter(
+                pk=job.pk, status=ImportJob.Status.RUNNING, heartbeat_at=job.heartbeat_at
+            ).update(status=ImportJob.Status.QUEUED, started_at=None, heartbeat_at=None)
+        else:
+            ImportJob.objects.filter(
+                pk=job.pk, status=ImportJob.Status.RUNNING, heartbeat_at=job.heartbeat_at
+            ).update(
+                status=ImportJob.Status.FAILED,
+                error='The import worker stopped before the job finished.',
+                finished_at=timezone.now(),
+            )
+    return list(
+        ImportJob.objects.filter(status=ImportJob.Status.QUEUED)
+        .filter(Q(created_at__lt=cutoff) | Q(pk__in=[job.pk for job in stalled]))
+        .order_by('created_at')
+        .values_list('pk', flat=True)
+    )
+
+
+def resume_stale_jobs() -> None:
+    """Recover stale jobs and hand them to this process's import threads."""
+    executor = _get_executor()
+    for job_id in recover_stale_jobs():
+        if executor is not None:
+            executor.submit(_run_in_thread, job_id)
+
+
+def _finish(job_id: int, result: ImportResult, status: str, error: str = '') -> None:
+    _save_progress(job_id, result, status=status, error=error, finished_at=timezone.now())
+
+
+def run_import_job(job_id: int) -> bool:
+    """Run one queued job to completion. Returns False if it was not claimable."""
+    if not _claim(job_id):
+        return False
+    job = ImportJob.objects.get(pk=job_id)
+    result = ImportResult()
+    path = Path(job.spool_path)
+    try:
+        with path.open('rb') as handle, open_bundle(handle) as stream:
+            import_tool_stream(
+                iter_bundle_entries(stream),
+                overwrite=job.overwrite,
+                result=result,
+                on_batch=lambda progress: _save_progress(job_id, progress),
+            )
+    except (ValueError, OSError, EOFError) as exc:
+        # Malformed or truncated bundle; batches before the error stay committed.
+        _finish(job_id, result, ImportJob.Status.FAILED, f'Invalid bundle: {exc}')
+    except Exception as exc:
+        logger.exception('Import job %s failed', job_id)
+        _finish(job_id, result, ImportJob.Status.FAILED, str(exc) or exc.__class__.__name__)
+    else:
+        _finish(job_id, result, ImportJob.Status.SUCCEEDED)
+    finally:
+        path.unlink(missing_ok=True)
+    return True
+
+
+def _run_in_thread(job_id: int) -> None:
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def run_queued_jobs() -> int:
+    recover_stale_jobs()
+    processed = 0
+    queued = ImportJob.objects.filter(status=ImportJob.Status.QUEUED).order_by('created_at')
+    for job_id in queued.values_list('pk', flat=True):
+        if run_import_job(job_id):
+            processed += 1
+    return processed
+
+
+def job_payload(job: ImportJob) -> dict:
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'source_name': job.source_name,
+        'overwrite': job.overwrite,
+        **{field: getattr(job, field) for field in PROGRESS_FIELDS},
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
@@ -0,0 +1,153 @@
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from zxui.metrics import RequestSample
+from zxui.synthetic import synthetic_catalog
+from zxui.transfer import import_tool_stream
+
+PAGES = (
+    ('overview', '/'),
+    ('composer', '/composer/'),
+    ('library', '/library/'),
+    ('manage', '/manage/'),
+    ('export', '/export/'),
+)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _measure(func, repeat):
+    """Time ``repeat`` plain runs, then one more under tracemalloc for memory and queries."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    queries = RequestSample()
+    tracemalloc.start()
+    try:
+        with connection.execute_wrapper(queries):
+            extra = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'runs': repeat,
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(_percentile(samples, 0.95), 2),
+        'p99_ms': round(_percentile(samples, 0.99), 2),
+        'max_ms': round(max(samples), 2),
+        'queries': queries.queries,
+        'db_ms': round(queries.db_seconds * 1000, 2),
+        'peak_memory_kb': round(peak / 1024),
+        **extra,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Build synthetic catalogs in a throwaway test database and time page renders, '
+        'export and import. Prints JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000', help='Comma-separated command counts, e.g. 1000,10000,100000.'
+        )
+        parser.add_argument('--tools', type=int, default=100, help='Tools per catalog.')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per page.')
+        parser.add_argument('--import-repeat', type=int, default=3, help='Timed runs per import mode.')
+        parser.add_argument('--seed', type=int, default=9999)
+        parser.add_argument('--output', help='Write the JSON report here as well as to stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes takes comma-separated integers.')
+        report = {
+            'vendor': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            # DEBUG=1 wraps every cursor to log queries; compare runs made the same way.
+            'debug': settings.DEBUG,
+            'repeat': options['repeat'],
+            'catalogs': [],
+        }
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for size in sizes:
+                report['catalogs'].append(self._run_size(size, options))
+        encoded = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(encoded + '\n', encoding='utf-8')
+        self.stdout.write(encoded)
+
+    def _run_size(self, size, options):
+        with tempfile.TemporaryDirectory() as scratch:
+            # Never touch the real catalog: each size gets a fresh test database
+            # (a file, not :memory:, on SQLite so timings include real I/O).
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = str(Path(scratch) / 'benchmark.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                return self._run_catalog(size, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run_catalog(self, size, options):
+        def entries():
+            return synthetic_catalog(size, options['tools'], options['seed'])
+
+        def load(overwrite):
+            def run():
+                result = import_tool_stream(entries(), overwrite=overwrite)
+                return {'commands': result.commands_processed}
+
+            return run
+
+        # The first import creates the catalog, so it can only run once.
+        queries = RequestSample()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            import_tool_stream(entries())
+        results = {
+            'import_new': {
+                'runs': 1,
+                'ms': round((time.perf_counter() - started) * 1000, 2),
+                'queries': queries.queries,
+                'db_ms': round(queries.db_seconds * 1000, 2),
+            }
+        }
+        client = Client()
+
+        def fetch(url):
+            def run():
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{url} answered {response.status_code}.')
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                return {'bytes': len(body)}
+
+            return run
+
+        for label, url in PAGES:
+            results[label] = _measure(fetch(url), max(1, options['repeat']))
+        import_repeat = max(1, options['import_repeat'])
+        results['import_skip_existing'] = _measure(load(False), import_repeat)
+        results['import_overwrite'] = _measure(load(True), import_repeat)
+        return {'commands': size, 'tools': options['tools'], 'results': results}
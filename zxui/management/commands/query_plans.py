@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from zxui.catalog import catalog_version
+from zxui.models import CommandTag, CommandTemplate, Tool
+from zxui.tags import filter_by_tag, tag_facets
+
+
+def _hot_queries():
+    first_tool = Tool.objects.order_by('name').values_list('id', flat=True).first() or 0
+    category = (
+        CommandTemplate.objects.exclude(category='')
+        .values_list('category', flat=True)
+        .annotate(total=Count('id'))
+        .order_by('-total')
+        .first()
+        or ''
+    )
+    tag = next(
+        (tags[0] for tags in CommandTemplate.objects.values_list('tags', flat=True)[:200] if tags),
+        '',
+    )
+    queries = [
+        ('newest command', CommandTemplate.objects.order_by('-updated_at')[:1]),
+        ('newest tool', Tool.objects.order_by('-updated_at')[:1]),
+        (
+            'distinct categories',
+            CommandTemplate.objects.exclude(category='')
+            .values_list('category', flat=True)
+            .order_by('category')
+            .distinct(),
+        ),
+        (f'category = {category!r}', CommandTemplate.objects.filter(category=category).order_by('name', 'id')[:50]),
+        ('commands by name', CommandTemplate.objects.order_by('name', 'id')[:50]),
+        ('tool commands page', CommandTemplate.objects.filter(tool_id=first_tool).order_by('name', 'id')[:50]),
+    ]
+    # The Tag tables arrive in 0011; older schemas are still worth comparing.
+    if CommandTag._meta.db_table in connection.introspection.table_names():
+        queries += [
+            (f'tag = {tag!r}', filter_by_tag(CommandTemplate.objects.all(), tag).order_by('name', 'id')[:50]),
+            ('tag facets', tag_facets()[:50]),
+        ]
+    return queries
+
+
+class Command(BaseCommand):
+    help = 'Print query plans and timings for the catalog hot queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Executions to average per query.')
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        for label, queryset in _hot_queries():
+            elapsed = self._time(lambda: list(queryset._chain()), repeat)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}  ({elapsed:.3f} ms)'))
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'  {line}')
+        elapsed = self._time(catalog_version, repeat)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'catalog version  ({elapsed:.3f} ms)'))
+        self.stdout.write(f'Timings average {repeat} runs on {connection.vendor}.')
+
+    @staticmethod
+    def _time(func, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) * 1000 / repeat
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from zxui.jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued import jobs (for deployments with ZX_IMPORT_WORKERS=0).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs.')
+        parser.add_argument('--interval', type=float, default=2.0, help='Polling interval in seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_queued_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} import job(s).')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,109 @@
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from zxui.catalog import catalog_version
+from zxui.models import CommandTemplate, Tool
+from zxui.synthetic import synthetic_catalog
+from zxui.transfer import IMPORT_STREAM_BATCH, import_tool_stream
+
+
+def _read_once():
+    catalog_version()
+    list(Tool.objects.order_by('name', 'id').values('id', 'name')[:50])
+    list(CommandTemplate.objects.filter(category='Recon').order_by('name', 'id').values('id', 'name')[:50])
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure read latency while a large import writes, on a scratch copy of the schema. '
+        'Compare runs with and without ZX_DB_PROFILE=production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tools', type=int, default=200)
+        parser.add_argument('--commands', type=int, default=250, help='Commands per tool.')
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--batch', type=int, default=IMPORT_STREAM_BATCH, help='Commands per committed batch.')
+        parser.add_argument('--database-file', help='Scratch SQLite file (default: a temporary file).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark targets SQLite.')
+        with tempfile.TemporaryDirectory() as scratch:
+            path = Path(options['database_file'] or Path(scratch) / 'bench.sqlite3')
+            self._use_database(path)
+            call_command('migrate', verbosity=0, interactive=False)
+            report = self._run(options)
+            connections.close_all()
+        self.stdout.write(f"profile            {settings.ZX_DB_PROFILE}")
+        for key, value in report.items():
+            self.stdout.write(f'{key:<18} {value}')
+
+    def _use_database(self, path):
+        # Never benchmark against the real catalog: point every thread's
+        # connection at the scratch file before any of them opens.
+        connections.close_all()
+        connections.settings['default']['NAME'] = str(path)
+        del connections['default']
+
+    def _run(self, options):
+        done = threading.Event()
+        samples = []
+        errors = [0]
+        lock = threading.Lock()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    started = time.perf_counter()
+                    try:
+                        _read_once()
+                    except OperationalError:
+                        with lock:
+                            errors[0] += 1
+                        continue
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        samples.append(elapsed)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(max(1, options['readers']))]
+        for thread in threads:
+            thread.start()
+        started = time.perf_counter()
+        try:
+            result = import_tool_stream(
+                synthetic_catalog(options['tools'] * options['commands'], options['tools']),
+                batch_size=max(1, options['batch']),
+            )
+        finally:
+            import_seconds = time.perf_counter() - started
+            done.set()
+            for thread in threads:
+                thread.join()
+        return {
+            'imported commands': result.created_commands,
+            'import seconds': f'{import_seconds:.2f}',
+            'reads completed': len(samples),
+            'reads per second': f'{len(samples) / import_seconds:.1f}' if import_seconds else '0',
+            'read errors': errors[0],
+            'read p50 ms': f'{statistics.median(samples) if samples else 0:.2f}',
+            'read p95 ms': f'{_percentile(samples, 0.95):.2f}',
+            'read max ms': f'{max(samples, default=0):.2f}',
+        }
@@ -0,0 +1,37 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from zxui.synthetic import synthetic_catalog
+from zxui.transfer import import_tool_stream
+
+
+class Command(BaseCommand):
+    help = 'Write a synthetic import bundle of the given size, or import it with --load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--commands', type=int, default=10000, help='Total command templates.')
+        parser.add_argument('--tools', type=int, default=100, help='Tools to spread them over.')
+        parser.add_argument('--seed', type=int, default=9999)
+        parser.add_argument('--output', help='Bundle path (default: stdout).')
+        parser.add_argument('--load', action='store_true', help='Import into the configured database instead.')
+
+    def handle(self, *args, **options):
+        entries = synthetic_catalog(max(0, options['commands']), options['tools'], options['seed'])
+        if options['load']:
+            result = import_tool_stream(entries)
+            self.stdout.write(
+                f'Imported {result.created_tools} tool(s) and {result.created_commands} command(s).'
+            )
+            return
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            output.write('{"tools":[')
+            for index, entry in enumerate(entries):
+                output.write(',' if index else '')
+                output.write(json.dumps(entry, separators=(',', ':')))
+            output.write(']}\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
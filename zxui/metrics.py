@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import bisect
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Counters of worker processes that have exited, kept so totals never go backwards.
+RETIRED_FILE = 'retired.json'
+
+logger = logging.getLogger(__name__)
+
+# name, help, buckets, RequestSample attribute
+HISTOGRAMS = (
+    ('zx_request_duration_seconds', 'Time spent handling the request.', DURATION_BUCKETS, 'total_seconds'),
+    ('zx_db_queries', 'Database queries per request.', QUERY_BUCKETS, 'queries'),
+    ('zx_db_duration_seconds', 'Time spent in database queries.', DURATION_BUCKETS, 'db_seconds'),
+    ('zx_template_duration_seconds', 'Time spent rendering templates.', DURATION_BUCKETS, 'template_seconds'),
+    ('zx_response_size_bytes', 'Response body size; streamed bodies are not counted.', SIZE_BUCKETS, 'size'),
+)
+
+_current_sample: ContextVar[RequestSample | None] = ContextVar('zx_metrics_sample', default=None)
+
+
+class RequestSample:
+    """Per-request counters; also usable as a ``connection.execute_wrapper``."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.total_seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.size = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    def activate(self):
+        return _current_sample.set(self)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _current_sample.reset(token)
+
+    def finish(self, response) -> None:
+        self.total_seconds = time.perf_counter() - self.started
+        if not response.streaming:
+            self.size = len(response.content)
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template_seconds * 1000:.1f}, '
+            f'total;dur={self.total_seconds * 1000:.1f}'
+        )
+
+
+class Histogram:
+    def __init__(self, buckets) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Cumulative per-view histograms for this process, in Prometheus text format.
+
+    With a shared directory, each process also writes its counters to
+    ``<pid>.json`` there and ``render`` adds up every process's file, so any
+    worker can answer a scrape for the whole server.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._responses: dict[tuple[str, int], int] = {}
+        self._flushed = 0.0
+        self._timer: threading.Timer | None = None
+
+    def record(self, view: str, status: int, sample: RequestSample) -> None:
+        with self._lock:
+            for name, _, buckets, attribute in HISTOGRAMS:
+                value = getattr(sample, attribute)
+                if value is None:
+                    continue
+                histogram = self._histograms.get((name, view))
+                if histogram is None:
+                    histogram = self._histograms[(name, view)] = Histogram(buckets)
+                histogram.observe(value)
+            self._responses[(view, status)] = self._responses.get((view, status), 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'histograms': [
+                    [name, view, list(histogram.counts), histogram.sum, histogram.count]
+                    for (name, view), histogram in self._histograms.items()
+                ],
+                'responses': [[view, status, count] for (view, status), count in self._responses.items()],
+            }
+
+    def flush(self, directory, interval: float = 1.0) -> None:
+        """Write this process's counters to ``directory``, at most once per ``interval`` seconds.
+
+        A throttled call schedules one trailing write, so the file catches up
+        even if this worker gets no further requests.
+        """
+        now = time.monotonic()
+        with self._lock:
+            wait = self._flushed + interval - now
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self._flush_later, (directory,))
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._flushed = now
+        self._write(directory)
+
+    def _flush_later(self, directory) -> None:
+        with self._lock:
+            self._timer = None
+            self._flushed = time.monotonic()
+        self._write(directory)
+
+    def _write(self, directory) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        scratch = directory / f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        scratch.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+        os.replace(scratch, path)
+
+    def render(self, directory=None) -> str:
+        if directory is None:
+            merged = _merge([self.snapshot()])
+        else:
+            self.flush(directory, interval=0)
+            merged = _merge(_load(path) for path in Path(directory).glob('*.json'))
+        histograms = {(name, view): (counts, total, count) for name, view, counts, total, count in merged['histograms']}
+        lines = ['# HELP zx_responses_total Responses by view and status code.', '# TYPE zx_responses_total counter']
+        for view, status, count in sorted(merged['responses']):
+            lines.append(f'zx_responses_total{{view="{view}",status="{status}"}} {count}')
+        for name, help_text, buckets, _ in HISTOGRAMS:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, view), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip((*buckets, '+Inf'), counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{view="{view}"}} {total:.6f}')
+                lines.append(f'{name}_count{{view="{view}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _load(path: Path) -> dict | None:
+    """A worker file's counters, or None if it is gone or damaged."""
+    try:
+        # Merging on its own first checks the shape, so one truncated or
+        # corrupt file is skipped instead of breaking every scrape.
+        return _merge([json.loads(path.read_text(encoding='utf-8'))])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning('Skipping unreadable metrics file %s', path)
+        return None
+
+
+def _merge(snapshots) -> dict:
+    histograms: dict[tuple[str, str], list] = {}
+    responses: dict[tuple[str, int], int] = {}
+    for snapshot in snapshots:
+        if snapshot is None:
+            continue
+        for name, view, counts, total, count in snapshot['histograms']:
+            merged = histograms.setdefault((name, view), [[0] * len(counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+        for view, status, count in snapshot['responses']:
+            responses[(view, status)] = responses.get((view, status), 0) + count
+    return {
+        'histograms': [[name, view, *values] for (name, view), values in histograms.items()],
+        'responses': [[view, status, count] for (view, status), count in responses.items()],
+    }
+
+
+def retire_worker(directory, pid: int) -> None:
+    """Fold an exited worker's file into ``retired.json`` and remove it.
+
+    Called from Gunicorn's master when a worker exits, and by each new worker
+    for its own pid, so a reused pid never starts from a dead process's counts.
+    """
+    directory = Path(directory)
+    path = directory / f'{pid}.json'
+    snapshot = _load(path)
+    if snapshot is not None:
+        retired = directory / RETIRED_FILE
+        scratch = directory / f'.retired.{os.getpid()}.tmp'
+        scratch.write_text(json.dumps(_merge([_load(retired), snapshot])), encoding='utf-8')
+        os.replace(scratch, retired)
+    path.unlink(missing_ok=True)
+
+
+def scrape_allowed(request) -> bool:
+    """Whether ``request`` may read /metrics: an allowed address or the bearer token."""
+    token = settings.ZX_METRICS_TOKEN
+    if token:
+        header = request.headers.get('Authorization', '')
+        if hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+            return True
+    # A proxied request's REMOTE_ADDR is the proxy's (often 127.0.0.1), not the client's.
+    if 'X-Forwarded-For' in request.headers or 'Forwarded' in request.headers:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.ZX_METRICS_ALLOWED_IPS)
+
+
+registry = Registry()
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        sample = _current_sample.get()
+        # Only the outermost render is timed; nested render_to_string calls
+        # are already inside it.
+        if sample is None or sample.template_depth:
+            return super().render(context, request)
+        sample.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            sample.template_seconds += time.perf_counter() - started
+            sample.template_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for the metrics middleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import posixpath
+import re
+from contextlib import ExitStack
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .metrics import RequestSample, registry
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+# Preferred first: brotli is smaller, gzip is universally understood.
+ENCODINGS = (
+    ('br', '.br', re.compile(r'\bbr\b')),
+    ('gzip', '.gz', re.compile(r'\bgzip\b')),
+)
+
+
+class StaticFilesMiddleware:
+    """Serve the collectstatic output from STATIC_ROOT.
+
+    Content-hashed names from the manifest are cached as immutable; any other
+    file is revalidated. A precompressed sibling is returned when the client
+    accepts its encoding.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ZX_SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = os.fspath(settings.STATIC_ROOT)
+        self.hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        name = posixpath.normpath(unquote(name)).lstrip('/')
+        try:
+            path = safe_join(self.root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(path):
+            if self.hashed_names:
+                return None
+            # No collectstatic output yet: fall back to the source directories.
+            path = finders.find(name)
+            if not path:
+                return None
+
+        stat = os.stat(path)
+        immutable = name in self.hashed_names
+        accept = request.headers.get('Accept-Encoding', '')
+        served, encoding, has_variants = path, None, False
+        for coding, suffix, pattern in ENCODINGS:
+            if not os.path.isfile(path + suffix):
+                continue
+            has_variants = True
+            if encoding is None and pattern.search(accept):
+                served, encoding = path + suffix, coding
+
+        size = os.path.getsize(served)
+        etag = f'"{int(stat.st_mtime):x}-{size:x}"'
+        headers = {
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            'ETag': etag,
+            'Last-Modified': http_date(stat.st_mtime),
+        }
+        if has_variants:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if_none_match = request.headers.get('If-None-Match')
+        if (if_none_match and etag in if_none_match) or (
+            not if_none_match
+            and not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime)
+        ):
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            response = FileResponse(
+                open(served, 'rb'),
+                content_type=content_type,
+                filename=posixpath.basename(name),
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+class MetricsMiddleware:
+    """Time each request per view: wall clock, queries, templates and body size.
+
+    Adds a ``Server-Timing`` header and feeds the ``/metrics`` histograms.
+    Removed from the stack entirely unless ``ZX_METRICS`` is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ZX_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = RequestSample()
+        token = sample.activate()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            sample.deactivate(token)
+        sample.finish(response)
+        match = request.resolver_match
+        # Unresolved paths share one label so 404 scans cannot grow the registry.
+        registry.record(match.view_name if match else 'unresolved', response.status_code, sample)
+        if settings.ZX_METRICS_DIR:
+            registry.flush(settings.ZX_METRICS_DIR)
+        response['Server-Timing'] = sample.server_timing()
+        return response
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0006_commandtemplate_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('queued', 'Queued'),
+                            ('running', 'Running'),
+                            ('succeeded', 'Succeeded'),
+                            ('failed', 'Failed'),
+                        ],
+                        default='queued',
+                        max_length=16,
+                    ),
+                ),
+                ('source_name', models.CharField(blank=True, max_length=255)),
+                ('spool_path', models.CharField(max_length=500)),
+                ('overwrite', models.BooleanField(default=False)),
+                ('tools_processed', models.PositiveIntegerField(default=0)),
+                ('commands_processed', models.PositiveIntegerField(default=0)),
+                ('created_tools', models.PositiveIntegerField(default=0)),
+                ('created_commands', models.PositiveIntegerField(default=0)),
+                ('updated_commands', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={'ordering': ['-created_at']},
+        ),
+    ]
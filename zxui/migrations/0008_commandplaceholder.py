@@ -0,0 +1,46 @@
+import re
+
+from django.db import migrations, models
+
+PLACEHOLDER_RE = re.compile(r'\{([a-zA-Z0-9_]+)\}')
+
+
+def backfill_placeholders(apps, schema_editor):
+    # Covers every preset seeded by 0002/0004/0005 and anything added since.
+    CommandTemplate = apps.get_model('zxui', 'CommandTemplate')
+    CommandPlaceholder = apps.get_model('zxui', 'CommandPlaceholder')
+    rows = []
+    for command_id, template in CommandTemplate.objects.values_list('id', 'template').iterator():
+        names = list(dict.fromkeys(PLACEHOLDER_RE.findall(template)))
+        rows.extend(
+            CommandPlaceholder(command_id=command_id, name=name, position=position)
+            for position, name in enumerate(names)
+        )
+    CommandPlaceholder.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0007_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandPlaceholder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=64)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                (
+                    'command',
+                    models.ForeignKey(
+                        on_delete=models.deletion.CASCADE,
+                        related_name='placeholders',
+                        to='zxui.commandtemplate',
+                    ),
+                ),
+            ],
+            options={'ordering': ['position'], 'unique_together': {('command', 'name')}},
+        ),
+        migrations.RunPython(backfill_placeholders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0008_commandplaceholder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['updated_at'], name='zxui_tool_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commandtemplate',
+            index=models.Index(fields=['name', 'id'], name='zxui_cmd_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commandtemplate',
+            index=models.Index(fields=['category', 'name'], name='zxui_cmd_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commandtemplate',
+            index=models.Index(fields=['updated_at'], name='zxui_cmd_updated_idx'),
+        ),
+    ]
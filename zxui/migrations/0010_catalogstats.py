@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_stats(apps, schema_editor):
+    CatalogStats = apps.get_model('zxui', 'CatalogStats')
+    CommandTemplate = apps.get_model('zxui', 'CommandTemplate')
+    Tool = apps.get_model('zxui', 'Tool')
+    commands = CommandTemplate.objects.all()
+    CatalogStats.objects.update_or_create(
+        pk=1,
+        defaults={
+            'tool_count': Tool.objects.count(),
+            'command_count': commands.count(),
+            'category_count': commands.exclude(category='').values('category').distinct().count(),
+            'latest_command_id': commands.order_by('-updated_at', '-id').values_list('id', flat=True).first(),
+        },
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0009_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tool_count', models.PositiveIntegerField(default=0)),
+                ('command_count', models.PositiveIntegerField(default=0)),
+                ('category_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                (
+                    'latest_command',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='+',
+                        to='zxui.commandtemplate',
+                    ),
+                ),
+            ],
+            options={'verbose_name_plural': 'catalog stats'},
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    CommandTemplate = apps.get_model('zxui', 'CommandTemplate')
+    Tag = apps.get_model('zxui', 'Tag')
+    CommandTag = apps.get_model('zxui', 'CommandTag')
+    links = []
+    for command_id, tags in CommandTemplate.objects.values_list('id', 'tags').iterator():
+        for name in dict.fromkeys(str(tag).strip().lower()[:255] for tag in tags or []):
+            if name:
+                links.append((command_id, name))
+    Tag.objects.bulk_create([Tag(name=name) for name in {name for _, name in links}])
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+    CommandTag.objects.bulk_create(
+        [CommandTag(command_id=command_id, tag_id=tag_ids[name]) for command_id, name in links],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0010_catalogstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+            options={'ordering': ['name']},
+        ),
+        migrations.CreateModel(
+            name='CommandTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'command',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='tag_links',
+                        to='zxui.commandtemplate',
+                    ),
+                ),
+                (
+                    'tag',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='command_links',
+                        to='zxui.tag',
+                    ),
+                ),
+            ],
+            options={'unique_together': {('command', 'tag')}},
+        ),
+        migrations.AddField(
+            model_name='commandtemplate',
+            name='tag_set',
+            field=models.ManyToManyField(
+                blank=True, related_name='commands', through='zxui.CommandTag', to='zxui.tag'
+            ),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
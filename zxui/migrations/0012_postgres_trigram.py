@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# PostgreSQL only. The expressions match what icontains compiles to there
+# (UPPER(col::text) LIKE ...), so substring search can use the trigram
+# indexes. SQLite keeps its FTS5 table from 0006.
+CREATE_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_name_trgm ON zxui_commandtemplate '
+    'USING gin (UPPER(name::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_template_trgm ON zxui_commandtemplate '
+    'USING gin (UPPER(template::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_tags_gin ON zxui_commandtemplate '
+    'USING gin (tags jsonb_path_ops)',
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS zxui_cmd_tags_gin',
+    'DROP INDEX IF EXISTS zxui_cmd_template_trgm',
+    'DROP INDEX IF EXISTS zxui_cmd_name_trgm',
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0011_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
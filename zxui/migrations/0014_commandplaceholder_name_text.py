@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0013_importjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='commandplaceholder',
+            name='name',
+            field=models.TextField(db_index=True),
+        ),
+    ]
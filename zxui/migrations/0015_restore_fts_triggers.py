@@ -0,0 +1,18 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# On SQLite, 0011 adds tag_set by rebuilding zxui_commandtemplate, which
+# silently drops the FTS sync triggers from 0006. Recreate them and rebuild
+# the index from the table so rows written since then become searchable.
+fts = import_module('zxui.migrations.0006_commandtemplate_fts')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0014_commandplaceholder_name_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(fts.create_fts_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# PostgreSQL only, like 0012. Search matches every column by case-insensitive
+# substring, so description, category and the tags document get trigram
+# indexes too; the jsonb containment index on tags no longer serves a query.
+CREATE_SQL = [
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_description_trgm ON zxui_commandtemplate '
+    'USING gin (UPPER(description::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_category_trgm ON zxui_commandtemplate '
+    'USING gin (UPPER(category::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_tags_trgm ON zxui_commandtemplate '
+    'USING gin (UPPER(tags::text) gin_trgm_ops)',
+    'DROP INDEX IF EXISTS zxui_cmd_tags_gin',
+]
+
+DROP_SQL = [
+    'CREATE INDEX IF NOT EXISTS zxui_cmd_tags_gin ON zxui_commandtemplate USING gin (tags jsonb_path_ops)',
+    'DROP INDEX IF EXISTS zxui_cmd_tags_trgm',
+    'DROP INDEX IF EXISTS zxui_cmd_category_trgm',
+    'DROP INDEX IF EXISTS zxui_cmd_description_trgm',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0015_restore_fts_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_command_counts(apps, schema_editor):
+    CommandTemplate = apps.get_model('zxui', 'CommandTemplate')
+    Tool = apps.get_model('zxui', 'Tool')
+    counts = (
+        CommandTemplate.objects.filter(tool=OuterRef('pk'))
+        .order_by()
+        .values('tool')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Tool.objects.update(command_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('zxui', '0016_postgres_search_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='command_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_command_counts, migrations.RunPython.noop),
+    ]
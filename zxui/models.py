@@ -4,11 +4,16 @@ from django.db import models
 class Tool(models.Model):
     name = models.CharField(max_length=80, unique=True)
     description = models.TextField(blank=True)
+    # Kept current by the stats deltas in signals.py and the importer.
+    command_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['updated_at'], name='zxui_tool_updated_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -21,12 +26,110 @@ class CommandTemplate(models.Model):
     template = models.TextField()
     category = models.CharField(max_length=60, blank=True, default='')
     tags = models.JSONField(default=list)
+    # Normalized copy of ``tags`` for indexed lookups; ``tags`` stays the source.
+    tag_set = models.ManyToManyField('Tag', through='CommandTag', related_name='commands', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
         unique_together = ('tool', 'name')
+        # (tool, name) is already covered by the unique constraint's index.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='zxui_cmd_name_idx'),
+            models.Index(fields=['category', 'name'], name='zxui_cmd_category_idx'),
+            models.Index(fields=['updated_at'], name='zxui_cmd_updated_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.tool.name} - {self.name}"
+
+
+class CommandPlaceholder(models.Model):
+    command = models.ForeignKey(CommandTemplate, on_delete=models.CASCADE, related_name='placeholders')
+    # Unbounded like the placeholder syntax itself; a length cap would make
+    # saving a template with a long placeholder name fail on PostgreSQL.
+    name = models.TextField(db_index=True)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position']
+        unique_together = ('command', 'name')
+
+    def __str__(self) -> str:
+        return f"{{{self.name}}}"
+
+
+class Tag(models.Model):
+    # Lowercased, so lookups match tags regardless of how they were typed.
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CommandTag(models.Model):
+    command = models.ForeignKey(CommandTemplate, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='command_links')
+
+    class Meta:
+        unique_together = ('command', 'tag')
+
+    def __str__(self) -> str:
+        return f"{self.command_id}:{self.tag_id}"
+
+
+class CatalogStats(models.Model):
+    """Single-row aggregate for the Overview page, shifted by each catalog write."""
+
+    tool_count = models.PositiveIntegerField(default=0)
+    command_count = models.PositiveIntegerField(default=0)
+    category_count = models.PositiveIntegerField(default=0)
+    latest_command = models.ForeignKey(
+        CommandTemplate, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'catalog stats'
+
+    def __str__(self) -> str:
+        return f"{self.tool_count} tools, {self.command_count} commands"
+
+
+class ImportJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    source_name = models.CharField(max_length=255, blank=True)
+    spool_path = models.CharField(max_length=500)
+    overwrite = models.BooleanField(default=False)
+    tools_processed = models.PositiveIntegerField(default=0)
+    commands_processed = models.PositiveIntegerField(default=0)
+    created_tools = models.PositiveIntegerField(default=0)
+    created_commands = models.PositiveIntegerField(default=0)
+    updated_commands = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bumped after every committed batch; a RUNNING job that stops beating
+    # lost its worker process.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self) -> str:
+        return f"Import #{self.pk} ({self.status})"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (self.Status.QUEUED, self.Status.RUNNING)
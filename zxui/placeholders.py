@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from .bulk import insert_rows
+from .models import CommandPlaceholder
+from .rendering import compile_template
+
+SYNC_CHUNK_SIZE = 500
+
+
+def sync_placeholders(commands, fresh: bool = False) -> None:
+    """Rewrite the placeholder index for ``(command_id, template)`` pairs.
+
+    ``fresh`` commands were just inserted, so they have no old rows to delete.
+    """
+    commands = list(commands)
+    for start in range(0, len(commands), SYNC_CHUNK_SIZE):
+        chunk = commands[start : start + SYNC_CHUNK_SIZE]
+        if not fresh:
+            CommandPlaceholder.objects.filter(command_id__in=[pk for pk, _ in chunk]).delete()
+        insert_rows(
+            CommandPlaceholder,
+            ('command_id', 'name', 'position'),
+            (
+                (pk, name, position)
+                for pk, template in chunk
+                for position, name in enumerate(compile_template(template).placeholders)
+            ),
+            conflict='ON CONFLICT DO NOTHING',
+        )
+
+
+def filter_by_placeholders(queryset, names, prefix: str = ''):
+    # One indexed join per name: commands must take every requested placeholder.
+    for name in names:
+        queryset = queryset.filter(**{f'{prefix}placeholders__name': name})
+    return queryset
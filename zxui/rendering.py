@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Same placeholder syntax as the Composer (static/zxui/app.js).
+PLACEHOLDER_RE = re.compile(r'\{([a-zA-Z0-9_]+)\}')
+PLAN_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TemplatePlan:
+    # (literal, placeholder) pairs; the placeholder is None for the trailing literal.
+    segments: tuple[tuple[str, str | None], ...]
+    placeholders: tuple[str, ...]
+
+    def render(self, values, extra_args: str = '') -> str:
+        parts = []
+        for literal, key in self.segments:
+            parts.append(literal)
+            if key is None:
+                continue
+            value = values.get(key)
+            value = str(value).strip() if value is not None else ''
+            # Unfilled placeholders stay visible, as in the Composer.
+            parts.append(value if value else f'{{{key}}}')
+        output = ''.join(parts)
+        extra_args = (extra_args or '').strip()
+        if extra_args:
+            output = f'{output} {extra_args}'.strip()
+        return output
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_template(template: str) -> TemplatePlan:
+    """Split a template into literal and placeholder segments once per distinct template."""
+    segments = []
+    placeholders = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(template):
+        key = match.group(1)
+        segments.append((template[position : match.start()], key))
+        if key not in placeholders:
+            placeholders.append(key)
+        position = match.end()
+    segments.append((template[position:], None))
+    return TemplatePlan(segments=tuple(segments), placeholders=tuple(placeholders))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import CommandTemplate
+
+FTS_TABLE = 'zxui_commandtemplate_fts'
+# Column weights for bm25(), in FTS column order: name, description, template, category, tags.
+FTS_WEIGHTS = (10.0, 2.0, 4.0, 3.0, 3.0)
+SEARCH_FIELDS = ('name', 'description', 'template', 'category', 'tags')
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def parse_terms(query: str) -> list[str]:
+    return _TERM_RE.findall((query or '').lower())
+
+
+def _fts_ranked_ids(terms: list[str], limit: int) -> list[int]:
+    # Every term is quoted (so FTS operators in user input are inert) and
+    # prefix-matched, and all terms must match.
+    match = ' '.join(f'"{term}"*' for term in terms)
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    sql = (
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+        f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _matching_commands(terms: list[str]):
+    # Every term must match some column, case-insensitively, like FTS5 does.
+    queryset = CommandTemplate.objects.all()
+    for term in terms:
+        term_filter = Q()
+        for field in SEARCH_FIELDS:
+            term_filter |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(term_filter)
+    return queryset
+
+
+def _fallback_ranked_ids(terms: list[str], limit: int) -> list[int]:
+    return list(_matching_commands(terms).values_list('id', flat=True)[:limit])
+
+
+def _postgres_ranked_ids(terms: list[str], limit: int) -> list[int]:
+    # Each column's UPPER(col::text) LIKE is served by a pg_trgm GIN index
+    # (migrations 0012 and 0015); ranking reuses the FTS column weights.
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models import TextField
+    from django.db.models.functions import Cast
+
+    rank = None
+    for term in terms:
+        for field, weight in zip(SEARCH_FIELDS, FTS_WEIGHTS):
+            source = Cast(field, output_field=TextField()) if field == 'tags' else field
+            column_rank = TrigramWordSimilarity(term, source) * weight
+            rank = column_rank if rank is None else rank + column_rank
+    queryset = _matching_commands(terms).annotate(rank=rank).order_by('-rank', 'name', 'id')
+    return list(queryset.values_list('id', flat=True)[:limit])
+
+
+def search_commands(query: str, limit: int = 50) -> list[CommandTemplate]:
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        ids = _fts_ranked_ids(terms, limit)
+    elif connection.vendor == 'postgresql':
+        ids = _postgres_ranked_ids(terms, limit)
+    else:
+        ids = _fallback_ranked_ids(terms, limit)
+    commands = CommandTemplate.objects.select_related('tool').in_bulk(ids)
+    return [commands[command_id] for command_id in ids if command_id in commands]
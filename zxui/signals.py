@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import catalog
+from .models import CatalogStats, CommandTemplate, Tool
+from .placeholders import sync_placeholders
+from .stats import apply_stats_delta, refresh_stats
+from .tags import sync_tags
+
+
+def _invalidate_catalog(**kwargs):
+    # Bump only once the write is visible to other connections, otherwise a
+    # concurrent request could cache pre-commit data under the new version.
+    transaction.on_commit(catalog.bump_version, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+@receiver(post_save, sender=CommandTemplate)
+@receiver(post_delete, sender=CommandTemplate)
+def invalidate_catalog_on_write(sender, **kwargs):
+    _invalidate_catalog(**kwargs)
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_save, sender=Tool)
+def count_created_tool(sender, instance, created, using=None, **kwargs):
+    if created:
+        apply_stats_delta(tools=1, using=using)
+
+
+@receiver(pre_delete, sender=Tool)
+def remember_tool_commands(sender, instance, using=None, **kwargs):
+    # Its commands go in the same delete; settle them as one delta afterwards.
+    instance._stats_categories = Counter(
+        dict(
+            CommandTemplate.objects.using(using)
+            .filter(tool=instance)
+            .order_by()
+            .values('category')
+            .annotate(count=Count('id'))
+            .values_list('category', 'count')
+        )
+    )
+
+
+@receiver(post_delete, sender=Tool)
+def count_deleted_tool(sender, instance, using=None, **kwargs):
+    categories = getattr(instance, '_stats_categories', Counter())
+    apply_stats_delta(
+        tools=-1,
+        commands=-sum(categories.values()),
+        categories={category: -count for category, count in categories.items()},
+        refresh_latest=bool(categories),
+        using=using,
+    )
+
+
+@receiver(pre_save, sender=CommandTemplate)
+def remember_command_placement(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    instance._stats_previous = None
+    if instance.pk is None or instance._state.adding:
+        return
+    if update_fields is not None and not {'tool', 'tool_id', 'category'} & set(update_fields):
+        instance._stats_previous = (instance.tool_id, instance.category)
+        return
+    instance._stats_previous = (
+        CommandTemplate.objects.using(using).filter(pk=instance.pk).values_list('tool_id', 'category').first()
+    )
+
+
+@receiver(post_save, sender=CommandTemplate)
+def count_saved_command(sender, instance, created, using=None, update_fields=None, **kwargs):
+    previous = None if created else getattr(instance, '_stats_previous', None)
+    tool_commands = Counter({instance.tool_id: 1})
+    categories = Counter({instance.category: 1})
+    if previous is not None:
+        tool_commands[previous[0]] -= 1
+        categories[previous[1]] -= 1
+    touched = update_fields is None or 'updated_at' in update_fields
+    apply_stats_delta(
+        commands=0 if previous is not None else 1,
+        tool_commands=tool_commands,
+        categories=categories,
+        latest_command_id=instance.pk if touched else None,
+        using=using,
+    )
+
+
+@receiver(post_delete, sender=CommandTemplate)
+def count_deleted_command(sender, instance, using=None, origin=None, **kwargs):
+    if _origin_model(origin) is Tool:
+        return
+    apply_stats_delta(
+        commands=-1,
+        tool_commands={instance.tool_id: -1},
+        categories={instance.category: -1},
+        refresh_latest=True,
+        using=using,
+    )
+
+
+@receiver(post_save, sender=CommandTemplate)
+def index_command_placeholders(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'template' not in update_fields):
+        return
+    sync_placeholders([(instance.pk, instance.template)])
+
+
+@receiver(post_save, sender=CommandTemplate)
+def index_command_tags(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'tags' not in update_fields):
+        return
+    sync_tags([(instance.pk, instance.tags)])
+
+
+def invalidate_catalog_after_migrate(sender, using=None, **kwargs):
+    using = using or DEFAULT_DB_ALIAS
+    transaction.on_commit(catalog.bump_version, using=using)
+    # Migrating back to before 0010_catalogstats leaves no stats table to refresh.
+    if CatalogStats._meta.db_table in connections[using].introspection.table_names():
+        refresh_stats(using)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Subquery, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import CatalogStats, CommandTemplate, Tool
+
+STATS_PK = 1
+
+
+def _latest_commands(using: str):
+    return CommandTemplate.objects.using(using).order_by('-updated_at', '-id').values_list('id', flat=True)
+
+
+def refresh_stats(using: str = DEFAULT_DB_ALIAS) -> CatalogStats:
+    """Recount the stats row from scratch; writes keep it current with ``apply_stats_delta``."""
+    # Each aggregate is answered from an index (see 0009_catalog_indexes).
+    commands = CommandTemplate.objects.using(using)
+    stats, _ = CatalogStats.objects.using(using).update_or_create(
+        pk=STATS_PK,
+        defaults={
+            'tool_count': Tool.objects.using(using).count(),
+            'command_count': commands.count(),
+            'category_count': commands.exclude(category='').values('category').distinct().count(),
+            'latest_command_id': _latest_commands(using).first(),
+        },
+    )
+    return stats
+
+
+def _shifted(field: str, delta: int):
+    # Never below zero: a CHECK failure here would abort the user's write.
+    return Greatest(F(field) + delta, Value(0))
+
+
+def _category_delta(categories, using: str) -> int:
+    """Categories that appeared minus those that emptied, given commands gained per category.
+
+    Runs after the write, so a category was present before iff its count now,
+    less what it just gained, is positive.
+    """
+    changed = {category: gained for category, gained in categories.items() if category and gained}
+    if not changed:
+        return 0
+    now = dict(
+        CommandTemplate.objects.using(using)
+        .filter(category__in=changed)
+        .order_by()
+        .values('category')
+        .annotate(count=Count('id'))
+        .values_list('category', 'count')
+    )
+    delta = 0
+    for category, gained in changed.items():
+        after = now.get(category, 0)
+        delta += (after > 0) - (after - gained > 0)
+    return delta
+
+
+def apply_stats_delta(
+    *,
+    tools: int = 0,
+    commands: int = 0,
+    tool_commands=None,
+    categories=None,
+    latest_command_id: int | None = None,
+    refresh_latest: bool = False,
+    using: str | None = None,
+) -> None:
+    """Shift the stats row and ``Tool.command_count`` by what one write changed.
+
+    ``tool_commands`` and ``categories`` map a tool id or category to the
+    commands it gained (negative when lost). Call it inside the write's
+    transaction, after the write; a rollback undoes both together.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    by_delta: dict[int, list[int]] = {}
+    for tool_id, delta in (tool_commands or {}).items():
+        if delta:
+            by_delta.setdefault(delta, []).append(tool_id)
+    for delta, tool_ids in by_delta.items():
+        Tool.objects.using(using).filter(pk__in=tool_ids).update(command_count=_shifted('command_count', delta))
+
+    values = {}
+    if tools:
+        values['tool_count'] = _shifted('tool_count', tools)
+    if commands:
+        values['command_count'] = _shifted('command_count', commands)
+    category_delta = _category_delta(categories or {}, using)
+    if category_delta:
+        values['category_count'] = _shifted('category_count', category_delta)
+    if refresh_latest:
+        values['latest_command_id'] = Subquery(_latest_commands(using)[:1])
+    elif latest_command_id is not None:
+        values['latest_command_id'] = latest_command_id
+    if values:
+        CatalogStats.objects.using(using).filter(pk=STATS_PK).update(**values, refreshed_at=timezone.now())
+
+
+def get_stats(using: str = DEFAULT_DB_ALIAS) -> CatalogStats:
+    stats = CatalogStats.objects.using(using).select_related('latest_command__tool').filter(pk=STATS_PK).first()
+    if stats is None:
+        refresh_stats(using)
+        stats = CatalogStats.objects.using(using).select_related('latest_command__tool').get(pk=STATS_PK)
+    return stats
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import gzip
+import os
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover - optional
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - optional
+    rjsmin = None
+
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.map', '.xml'}
+# Below this size the compressed variant rarely pays for its extra request
+# negotiation and disk entry.
+MIN_COMPRESS_SIZE = 256
+
+
+def _minifier(name: str):
+    extension = os.path.splitext(name)[1]
+    if extension == '.css' and rcssmin is not None:
+        return rcssmin.cssmin
+    if extension == '.js' and rjsmin is not None:
+        return rjsmin.jsmin
+    return None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that minifies CSS/JS and writes .gz/.br siblings."""
+
+    # Names missing from the manifest fall back to hashing on the fly rather
+    # than failing the whole page.
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Before collectstatic has written a manifest (e.g. DEBUG=0 straight
+        # from a checkout) link the plain names instead of raising ValueError.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def _save(self, name, content):
+        minify = _minifier(name)
+        if minify is not None:
+            content.seek(0)
+            source = content.read()
+            if isinstance(source, bytes):
+                source = source.decode('utf-8')
+            content = ContentFile(minify(source).encode('utf-8'))
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                self._write_compressed(name)
+
+    def _write_compressed(self, name: str) -> None:
+        path = Path(self.path(name))
+        if not path.is_file():
+            return
+        data = path.read_bytes()
+        variants = {'.gz': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = lambda: brotli.compress(data, quality=11)
+        for suffix, compress in variants.items():
+            target = path.with_name(path.name + suffix)
+            compressed = compress() if len(data) >= MIN_COMPRESS_SIZE else None
+            if compressed is None or len(compressed) >= len(data):
+                target.unlink(missing_ok=True)
+                continue
+            target.write_bytes(compressed)
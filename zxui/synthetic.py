@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import random
+
+# (category, name, template, tags) patterns; {tool} is the generated tool name.
+PATTERNS = (
+    ('Recon', 'Service scan', '{tool} -sV -p {ports} {target}', ['scan', 'tcp']),
+    ('Recon', 'Host discovery', '{tool} --ping-sweep {cidr} -o {output}', ['discovery']),
+    ('Recon', 'DNS records', '{tool} -t {record_type} {domain} @{resolver}', ['dns']),
+    ('Web', 'Directory brute force', '{tool} dir -u {url} -w {wordlist} -t {threads}', ['http', 'wordlist']),
+    ('Web', 'Virtual hosts', '{tool} vhost -u {url} -w {wordlist} --append-domain', ['http', 'vhost']),
+    ('Web', 'Request replay', '{tool} -X {method} -H "Cookie: {cookie}" {url}', ['http']),
+    ('Network', 'Port forward', '{tool} -L {local_port}:{target}:{port} {user}@{jump_host}', ['tunnel', 'ssh']),
+    ('Network', 'Packet capture', '{tool} -i {interface} -w {output} port {port}', ['pcap']),
+    ('AD', 'Kerberoast', '{tool} -request -dc-ip {dc_ip} {domain}/{user}:{password}', ['kerberos', 'ad']),
+    ('AD', 'Share listing', '{tool} smb {target} -u {user} -p {password} --shares', ['smb', 'ad']),
+    ('Credentials', 'Hash cracking', '{tool} -m {hash_mode} {hash_file} {wordlist}', ['hashes', 'wordlist']),
+    ('Post', 'Reverse shell', '{tool} -e /bin/sh {lhost} {lport}', ['shell']),
+)
+VARIANTS = ('quick', 'full', 'stealth', 'verbose', 'json output', 'from file', 'ipv6', 'proxied')
+
+
+def synthetic_catalog(commands: int, tools: int, seed: int = 9999):
+    """Yield import-format tool entries holding ``commands`` commands in total.
+
+    Commands are spread evenly over ``tools`` tools and drawn from a fixed set
+    of realistic patterns, so the same arguments always give the same catalog.
+    """
+    rng = random.Random(seed)
+    tools = max(1, min(tools, commands or 1))
+    per_tool, extra = divmod(commands, tools)
+    for tool_index in range(tools):
+        tool_name = f'synth-{tool_index:05d}'
+        entries = []
+        for command_index in range(per_tool + (tool_index < extra)):
+            category, name, template, tags = PATTERNS[rng.randrange(len(PATTERNS))]
+            variant = VARIANTS[command_index % len(VARIANTS)]
+            entries.append(
+                {
+                    'name': f'{name} ({variant}) #{command_index}',
+                    'description': f'{name} with {tool_name}, {variant} variant.',
+                    'template': template.format_map(_KeepPlaceholders(tool=tool_name)),
+                    'category': category,
+                    'tags': [*tags, f'group-{rng.randrange(20)}'],
+                }
+            )
+        yield {
+            'name': tool_name,
+            'description': f'Synthetic tool {tool_index} generated for benchmarks.',
+            'commands': entries,
+        }
+
+
+class _KeepPlaceholders(dict):
+    def __missing__(self, key):
+        return f'{{{key}}}'
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from django.db.models import Count
+
+from .bulk import insert_rows
+from .models import CommandTag, Tag
+
+SYNC_CHUNK_SIZE = 500
+TAG_NAME_MAX = 255
+
+
+def tag_key(name) -> str:
+    return str(name).strip().lower()[:TAG_NAME_MAX]
+
+
+def sync_tags(commands, fresh: bool = False) -> None:
+    """Rewrite the tag links for ``(command_id, tags)`` pairs; ``fresh`` skips deleting old links."""
+    commands = list(commands)
+    for start in range(0, len(commands), SYNC_CHUNK_SIZE):
+        chunk = commands[start : start + SYNC_CHUNK_SIZE]
+        keys = {pk: list(dict.fromkeys(filter(None, map(tag_key, tags or [])))) for pk, tags in chunk}
+        names = {name for names in keys.values() for name in names}
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - set(tag_ids)
+        if missing:
+            insert_rows(Tag, ('name',), ((name,) for name in missing), conflict='ON CONFLICT DO NOTHING')
+            tag_ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+        if not fresh:
+            CommandTag.objects.filter(command_id__in=keys).delete()
+        # Another writer re-linking the same command may have inserted first.
+        insert_rows(
+            CommandTag,
+            ('command_id', 'tag_id'),
+            ((pk, tag_ids[name]) for pk, names in keys.items() for name in names),
+            conflict='ON CONFLICT DO NOTHING',
+        )
+
+
+def filter_by_tag(queryset, tag: str, prefix: str = ''):
+    return queryset.filter(**{f'{prefix}tag_links__tag__name': tag_key(tag)})
+
+
+def tag_facets(commands=None):
+    """``{'name', 'count'}`` rows, most used first, grouped on the link table's tag index."""
+    links = CommandTag.objects.all()
+    if commands is not None:
+        links = links.filter(command__in=commands)
+    return (
+        links.values('tag_id')
+        .annotate(count=Count('id'))
+        .values('tag__name', 'count')
+        .order_by('-count', 'tag__name')
+    )
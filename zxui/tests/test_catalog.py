@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from zxui.catalog import bump_version, catalog_version, get_snapshot
+from zxui.models import CommandTemplate, Tool
+from zxui.views import build_id
+
+
+def command_names(snapshot):
+    return {command['name'] for tool in snapshot.tools_payload for command in tool['commands']}
+
+
+class SnapshotInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tool = Tool.objects.create(name='catalogtool')
+        cls.command = CommandTemplate.objects.create(tool=cls.tool, name='Before', template='x {y}')
+
+    def setUp(self):
+        # Test data never commits, so its on_commit bump never ran.
+        bump_version()
+
+    def test_rebuilds_after_edit_and_delete(self):
+        first = get_snapshot()
+        self.assertIn('Before', command_names(first))
+        self.assertIs(get_snapshot(), first)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.command.name = 'After'
+            self.command.save()
+        edited = get_snapshot()
+        self.assertIsNot(edited, first)
+        self.assertEqual(command_names(edited) & {'Before', 'After'}, {'After'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.command.delete()
+        self.assertNotIn('After', command_names(get_snapshot()))
+
+    def test_token_catches_writes_from_other_processes(self):
+        get_snapshot(catalog_version().token)
+        # A queryset update sends no signal, like a write made by another worker.
+        CommandTemplate.objects.filter(pk=self.command.pk).update(name='Elsewhere', updated_at=timezone.now())
+        self.assertIn('Before', command_names(get_snapshot()))
+        self.assertIn('Elsewhere', command_names(get_snapshot(catalog_version().token)))
+
+
+class CatalogEtagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tool = Tool.objects.create(name='etagtool')
+        cls.command = CommandTemplate.objects.create(tool=cls.tool, name='Probe', template='probe {host}')
+
+    def setUp(self):
+        build_id.cache_clear()
+        self.addCleanup(build_id.cache_clear)
+
+    def fetch(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('zxui:library'), **headers)
+
+    def test_unchanged_catalog_answers_304(self):
+        etag = self.fetch()['ETag']
+        self.assertEqual(self.fetch(etag).status_code, 304)
+
+    def test_edit_changes_etag(self):
+        etag = self.fetch()['ETag']
+        self.command.template = 'probe -v {host}'
+        self.command.save()
+        response = self.fetch(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_changes_etag(self):
+        etag = self.fetch()['ETag']
+        self.command.delete()
+        response = self.fetch(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_build_id_changes_etag(self):
+        with override_settings(ZX_BUILD_ID='build-a'):
+            etag = self.fetch()['ETag']
+        build_id.cache_clear()
+        with override_settings(ZX_BUILD_ID='build-b'):
+            self.assertEqual(build_id(), 'build-b')
+            response = self.fetch(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,69 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from zxui.generation import combination_count, parse_values
+from zxui.models import CommandTemplate, Tool
+
+
+class CombinationCountTests(TestCase):
+    def test_counts_past_sys_maxsize(self):
+        self.assertEqual(combination_count([parse_values('2001:db8::/64')]), 2**64 - 1)
+        self.assertEqual(
+            combination_count([parse_values('0-99999999999999999999')]), 100000000000000000000
+        )
+
+    def test_stops_once_past_limit(self):
+        total = combination_count([parse_values('1-10'), parse_values('2001:db8::/64')], limit=5)
+        self.assertGreater(total, 5)
+
+
+@override_settings(ZX_GENERATE_MAX=1000)
+class GenerateLimitTests(TestCase):
+    def generate(self, params):
+        return self.client.post(
+            reverse('zxui:generate'),
+            data=json.dumps({'template': 'ping {target}', 'params': params}),
+            content_type='application/json',
+        )
+
+    def test_ipv6_slash_64_is_rejected(self):
+        response = self.generate({'target': '2001:db8::/64'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceed the limit', response.json()['error'])
+
+    def test_huge_range_is_rejected(self):
+        response = self.generate({'target': '0-99999999999999999999'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_small_range_streams(self):
+        response = self.generate({'target': '1-3'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Combination-Count'], '3')
+        self.assertEqual(b''.join(response.streaming_content), b'ping 1\nping 2\nping 3\n')
+
+
+class GenerateCommandIdTests(TestCase):
+    def generate(self, command_id):
+        return self.client.post(
+            reverse('zxui:generate'),
+            data=json.dumps({'command_id': command_id, 'params': {'target': '1-2'}}),
+            content_type='application/json',
+        )
+
+    def test_bad_id_is_rejected(self):
+        for command_id in ('abc', None, [1], True):
+            response = self.generate(command_id)
+            self.assertEqual(response.status_code, 400, command_id)
+            self.assertEqual(response.json()['error'], 'command_id must be an integer.')
+
+    def test_unknown_id_is_not_found(self):
+        self.assertEqual(self.generate(999999).status_code, 404)
+
+    def test_string_id_is_looked_up(self):
+        tool = Tool.objects.create(name='gentool')
+        command = CommandTemplate.objects.create(tool=tool, name='Ping', template='ping {target}')
+        response = self.generate(str(command.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'ping 1\nping 2\n')
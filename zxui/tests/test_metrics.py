@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from zxui.metrics import RETIRED_FILE, Registry, RequestSample, retire_worker
+
+
+@override_settings(ZX_METRICS=True, ZX_METRICS_ALLOWED_IPS=['127.0.0.1'], ZX_METRICS_TOKEN='', ZX_METRICS_DIR='')
+class MetricsAccessTests(TestCase):
+    def test_allowed_address(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_other_address_is_refused(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 403)
+
+    def test_proxied_request_is_refused_despite_loopback(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_X_FORWARDED_FOR='203.0.113.7').status_code, 403)
+
+    @override_settings(ZX_METRICS_ALLOWED_IPS=[], ZX_METRICS_TOKEN='s3cret')
+    def test_proxied_request_with_token(self):
+        response = self.client.get('/metrics', HTTP_X_FORWARDED_FOR='203.0.113.7', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ZX_METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_allowed_network(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+
+    @override_settings(ZX_METRICS_ALLOWED_IPS=[], ZX_METRICS_TOKEN='s3cret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    @override_settings(ZX_METRICS=False)
+    def test_disabled(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+
+class SharedRegistryTests(TestCase):
+    def test_render_adds_up_every_worker(self):
+        sample = RequestSample()
+        sample.queries, sample.size = 3, 100
+        with tempfile.TemporaryDirectory() as directory:
+            registry = Registry()
+            registry.record('library', 200, sample)
+            other = Registry()
+            other.record('library', 200, sample)
+            other.record('library', 404, sample)
+            Path(directory, '999999.json').write_text(json.dumps(other.snapshot()), encoding='utf-8')
+            body = registry.render(directory)
+        self.assertIn('zx_responses_total{view="library",status="200"} 2', body)
+        self.assertIn('zx_responses_total{view="library",status="404"} 1', body)
+        self.assertIn('zx_db_queries_count{view="library"} 3', body)
+        self.assertIn('zx_db_queries_sum{view="library"} 9.000000', body)
+
+    def test_damaged_file_is_skipped(self):
+        sample = RequestSample()
+        with tempfile.TemporaryDirectory() as directory:
+            registry = Registry()
+            registry.record('library', 200, sample)
+            Path(directory, '111111.json').write_text('{"histograms": [', encoding='utf-8')
+            Path(directory, '222222.json').write_text('{"histograms": 5, "responses": []}', encoding='utf-8')
+            with self.assertLogs('zxui.metrics', 'WARNING') as logs:
+                body = registry.render(directory)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('zx_responses_total{view="library",status="200"} 1', body)
+
+    def test_retired_workers_keep_their_counts(self):
+        sample = RequestSample()
+        with tempfile.TemporaryDirectory() as directory:
+            for pid in (111111, 222222):
+                worker = Registry()
+                worker.record('library', 200, sample)
+                Path(directory, f'{pid}.json').write_text(json.dumps(worker.snapshot()), encoding='utf-8')
+                retire_worker(directory, pid)
+                self.assertFalse(Path(directory, f'{pid}.json').exists())
+            retire_worker(directory, 333333)
+            self.assertEqual(sorted(path.name for path in Path(directory).iterdir()), [RETIRED_FILE])
+            body = Registry().render(directory)
+        self.assertIn('zx_responses_total{view="library",status="200"} 2', body)
+
+    def test_throttled_flush_catches_up(self):
+        sample = RequestSample()
+        with tempfile.TemporaryDirectory() as directory:
+            registry = Registry()
+            registry.record('library', 200, sample)
+            registry.flush(directory, interval=0.05)
+            registry.record('library', 200, sample)
+            registry.flush(directory, interval=0.05)
+            path = Path(directory, f'{os.getpid()}.json')
+            self.assertEqual(json.loads(path.read_text())['responses'], [['library', 200, 1]])
+            time.sleep(0.2)
+            self.assertEqual(json.loads(path.read_text())['responses'], [['library', 200, 2]])
@@ -0,0 +1,31 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from zxui.models import CommandTemplate, Tool
+
+
+class RenderCommandIdTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tool = Tool.objects.create(name='rendertool')
+        cls.command = CommandTemplate.objects.create(tool=tool, name='Ping', template='ping {target}')
+
+    def render(self, body):
+        return self.client.post(reverse('zxui:render'), data=json.dumps(body), content_type='application/json')
+
+    def test_string_id_is_rendered(self):
+        response = self.render({'command_id': str(self.command.pk), 'params': {'target': '10.0.0.1'}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['command_id'], self.command.pk)
+        self.assertEqual(response.json()['commands'], ['ping 10.0.0.1'])
+
+    def test_bad_id_is_rejected(self):
+        for command_id in ('abc', None, {'id': 1}):
+            response = self.render({'requests': [{'command_id': self.command.pk}, {'command_id': command_id}]})
+            self.assertEqual(response.status_code, 400, command_id)
+            self.assertEqual(response.json()['error'], 'command_id must be an integer.')
+
+    def test_unknown_id_is_not_found(self):
+        self.assertEqual(self.render({'command_id': '999999'}).status_code, 404)
@@ -0,0 +1,92 @@
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from zxui.models import CommandTemplate, Tool
+from zxui.search import FTS_TABLE, search_commands
+
+
+class SearchIndexTests(TestCase):
+    def test_new_and_edited_commands_are_searchable(self):
+        tool = Tool.objects.create(name='searchtool')
+        command = CommandTemplate.objects.create(tool=tool, name='Platypus sweep', template='d {x}')
+        self.assertEqual([result.pk for result in search_commands('platypus')], [command.pk])
+        command.name = 'Echidna sweep'
+        command.save()
+        self.assertEqual(search_commands('platypus'), [])
+        self.assertEqual([result.pk for result in search_commands('echidna')], [command.pk])
+        command.delete()
+        self.assertEqual(search_commands('echidna'), [])
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite only')
+class FtsTriggerTests(TestCase):
+    """The test database runs every migration, so this catches any later table rebuild."""
+
+    def test_sync_triggers_exist_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [CommandTemplate._meta.db_table],
+            )
+            triggers = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(
+            triggers,
+            {f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'},
+            'A migration rebuilt zxui_commandtemplate and dropped the FTS triggers; '
+            'recreate them as 0015_restore_fts_triggers does.',
+        )
+
+    def test_index_stays_in_sync_with_table(self):
+        tool = Tool.objects.create(name='ftstool')
+        command = CommandTemplate.objects.create(tool=tool, name='Gizzard probe', template='g {x}')
+        CommandTemplate.objects.filter(pk=command.pk).update(description='Rewritten')
+        CommandTemplate.objects.create(tool=tool, name='Other', template='o {x}').delete()
+        with connection.cursor() as cursor:
+            # Raises if the index differs from zxui_commandtemplate in any row.
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+        self.assertEqual([result.pk for result in search_commands('gizzard rewritten')], [command.pk])
+
+
+class SearchColumnTests(TestCase):
+    """Every backend must find a term in any searched column, case-insensitively."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tool = Tool.objects.create(name='searchtool')
+        cls.by_description = CommandTemplate.objects.create(
+            tool=tool, name='one', template='a {x}', description='Harvest zebrafinch tickets'
+        )
+        cls.by_category = CommandTemplate.objects.create(
+            tool=tool, name='two', template='b {x}', category='Quokkaland'
+        )
+        cls.by_tag = CommandTemplate.objects.create(
+            tool=tool, name='three', template='c {x}', tags=['Wombatscan', 'other']
+        )
+        cls.by_name = CommandTemplate.objects.create(tool=tool, name='Platypus sweep', template='d {x}')
+
+    def assertFinds(self, query, command):
+        self.assertIn(command.pk, [result.pk for result in search_commands(query)])
+
+    def test_description(self):
+        self.assertFinds('zebrafinch', self.by_description)
+
+    def test_category(self):
+        self.assertFinds('quokkaland', self.by_category)
+
+    def test_tag_is_case_insensitive(self):
+        self.assertFinds('wombatscan', self.by_tag)
+        self.assertFinds('WOMBATSCAN', self.by_tag)
+
+    def test_all_terms_must_match(self):
+        self.assertFinds('platypus sweep', self.by_name)
+        self.assertEqual(search_commands('platypus zebrafinch'), [])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'needs DATABASE_URL pointing at PostgreSQL')
+class PostgresSearchTests(SearchColumnTests):
+    def test_name_hits_rank_first(self):
+        tool = Tool.objects.get(name='searchtool')
+        CommandTemplate.objects.create(tool=tool, name='misc', template='e {x}', description='platypus')
+        self.assertEqual(search_commands('platypus')[0].pk, self.by_name.pk)
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models import Count
+from django.test import TestCase
+
+from zxui.models import CatalogStats, CommandTemplate, Tool
+from zxui.stats import STATS_PK, get_stats
+from zxui.transfer import import_tools
+
+
+class StatsDriftTests(TestCase):
+    """Every write shifts the stats by a delta; the totals must equal a recount."""
+
+    def assertNoDrift(self):
+        stats = CatalogStats.objects.get(pk=STATS_PK)
+        commands = CommandTemplate.objects.all()
+        self.assertEqual(stats.tool_count, Tool.objects.count())
+        self.assertEqual(stats.command_count, commands.count())
+        self.assertEqual(
+            stats.category_count, commands.exclude(category='').values('category').distinct().count()
+        )
+        latest = commands.order_by('-updated_at', '-id').values_list('id', flat=True).first()
+        self.assertEqual(stats.latest_command_id, latest)
+        counted = dict(Tool.objects.annotate(actual=Count('commands')).values_list('id', 'actual'))
+        self.assertEqual(dict(Tool.objects.values_list('id', 'command_count')), counted)
+
+    def setUp(self):
+        # The seed migrations already hold commands in some categories.
+        self.seeded_categories = get_stats().category_count
+        self.tool = Tool.objects.create(name='statstool')
+
+    def test_create_edit_and_delete(self):
+        first = CommandTemplate.objects.create(tool=self.tool, name='a', template='a', category='Alpha')
+        second = CommandTemplate.objects.create(tool=self.tool, name='b', template='b', category='Alpha')
+        self.assertNoDrift()
+        other = Tool.objects.create(name='othertool')
+        first.category = 'Beta'
+        first.tool = other
+        first.save()
+        self.assertNoDrift()
+        second.delete()
+        self.assertNoDrift()
+        first.delete()
+        self.assertNoDrift()
+        self.assertEqual(get_stats().category_count, self.seeded_categories)
+
+    def test_delete_tool_with_commands(self):
+        for index in range(3):
+            CommandTemplate.objects.create(tool=self.tool, name=str(index), template='x', category=f'C{index % 2}')
+        keep = Tool.objects.create(name='keeptool')
+        CommandTemplate.objects.create(tool=keep, name='k', template='k', category='C0')
+        self.tool.delete()
+        self.assertNoDrift()
+        Tool.objects.filter(pk=keep.pk).delete()
+        self.assertNoDrift()
+
+    def test_import_creates_and_overwrites(self):
+        CommandTemplate.objects.create(tool=self.tool, name='old', template='old', category='Zeta')
+        bundle = [
+            {'name': 'statstool', 'commands': [{'name': 'old', 'template': 'new', 'category': 'Eta'}]},
+            {'name': 'imported', 'commands': [{'name': 'n', 'template': 'n', 'category': 'Theta'}]},
+        ]
+        import_tools(bundle)
+        self.assertNoDrift()
+        self.assertEqual(get_stats().category_count, self.seeded_categories + 2)
+        import_tools(bundle, overwrite=True)
+        self.assertNoDrift()
+        self.assertEqual(get_stats().category_count, self.seeded_categories + 2)
+
+    def test_rollback_leaves_stats_alone(self):
+        before = CatalogStats.objects.get(pk=STATS_PK).command_count
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            CommandTemplate.objects.create(tool=self.tool, name='gone', template='x')
+            raise RuntimeError
+        self.assertEqual(CatalogStats.objects.get(pk=STATS_PK).command_count, before)
+        self.assertNoDrift()
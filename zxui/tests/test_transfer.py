@@ -0,0 +1,87 @@
+from django.test import TestCase
+
+from zxui.models import CommandTemplate, Tool
+from zxui.search import search_commands
+from zxui.transfer import import_tool_stream, import_tools
+
+
+def bundle(template='zorblax -p {ports} {target}', category='Recon', tags=('scan',), description='Port scanner'):
+    return [
+        {
+            'name': 'importtool',
+            'description': description,
+            'commands': [
+                {'name': 'Scan', 'template': template, 'category': category, 'tags': list(tags)},
+                {'name': 'Ping', 'template': 'ping {target}'},
+            ],
+        }
+    ]
+
+
+class ImportUpsertTests(TestCase):
+    def command(self, name='Scan'):
+        return CommandTemplate.objects.get(tool__name='importtool', name=name)
+
+    def test_new_import_indexes_placeholders_and_tags(self):
+        result = import_tools(bundle())
+        self.assertEqual((result.created_tools, result.created_commands, result.updated_commands), (1, 2, 0))
+        scan = self.command()
+        self.assertEqual(list(scan.placeholders.values_list('name', flat=True)), ['ports', 'target'])
+        self.assertEqual(list(scan.tag_set.values_list('name', flat=True)), ['scan'])
+        self.assertEqual([command.pk for command in search_commands('zorblax')][:1], [scan.pk])
+
+    def test_reimport_without_overwrite_keeps_existing_rows(self):
+        import_tools(bundle())
+        before = self.command()
+        result = import_tools(bundle(template='quuxscan {target}', category='Web', description='Changed'))
+        self.assertEqual((result.created_tools, result.created_commands, result.updated_commands), (0, 0, 0))
+        after = self.command()
+        self.assertEqual(
+            (after.template, after.category, after.updated_at), (before.template, 'Recon', before.updated_at)
+        )
+        self.assertEqual(Tool.objects.get(name='importtool').description, 'Port scanner')
+        self.assertEqual(list(after.placeholders.values_list('name', flat=True)), ['ports', 'target'])
+
+    def test_overwrite_rewrites_rows_and_indexes(self):
+        import_tools(bundle())
+        before = self.command()
+        result = import_tools(
+            bundle(template='quuxscan --rate {rate} {target}', category='Web', tags=('Fast',), description='Changed'),
+            overwrite=True,
+        )
+        self.assertEqual((result.created_tools, result.created_commands, result.updated_commands), (0, 0, 2))
+        after = self.command()
+        self.assertEqual(after.pk, before.pk)
+        self.assertEqual(
+            (after.template, after.category, after.tags), ('quuxscan --rate {rate} {target}', 'Web', ['Fast'])
+        )
+        self.assertEqual(after.created_at, before.created_at)
+        self.assertGreaterEqual(after.updated_at, before.updated_at)
+        self.assertEqual(list(after.placeholders.values_list('name', flat=True)), ['rate', 'target'])
+        self.assertEqual(list(after.tag_set.values_list('name', flat=True)), ['fast'])
+        self.assertEqual(Tool.objects.get(name='importtool').description, 'Changed')
+        self.assertEqual(search_commands('zorblax'), [])
+        self.assertIn(after.pk, [command.pk for command in search_commands('quuxscan')])
+
+    def test_duplicate_names_in_one_bundle(self):
+        entries = bundle()
+        entries[0]['commands'].append({'name': 'Scan', 'template': 'second {target}'})
+        result = import_tools(entries)
+        self.assertEqual((result.created_commands, result.updated_commands), (2, 0))
+        self.assertEqual(self.command().template, 'zorblax -p {ports} {target}')
+        result = import_tools(entries, overwrite=True)
+        self.assertEqual((result.created_commands, result.updated_commands), (0, 3))
+        self.assertEqual(self.command().template, 'second {target}')
+
+    def test_stream_batches_commit_independently(self):
+        entries = [
+            {'name': f'streamtool-{index}', 'commands': [{'name': 'Echo', 'template': f'echo {index} {{x}}'}]}
+            for index in range(5)
+        ]
+        batches = []
+        result = import_tool_stream(
+            entries, batch_size=2, on_batch=lambda result: batches.append(result.created_commands)
+        )
+        self.assertEqual(batches, [1, 2, 3, 4, 5])
+        self.assertEqual(result.created_tools, 5)
+        self.assertEqual(CommandTemplate.objects.filter(tool__name__startswith='streamtool-').count(), 5)
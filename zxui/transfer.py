@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+import gzip as gzip_module
+import io
+import json
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from . import catalog
+from .bulk import insert_rows
+from .models import CommandTemplate, Tool
+from .placeholders import sync_placeholders
+from .stats import apply_stats_delta
+from .tags import sync_tags
+
+EXPORT_CHUNK_SIZE = 200
+STREAM_BUFFER_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 500
+# Commands per committed batch when streaming an uploaded bundle.
+IMPORT_STREAM_BATCH = 2000
+READ_CHUNK_SIZE = 64 * 1024
+# Largest single JSON value (one tool entry) a streamed import will buffer.
+# Malformed input would otherwise be read to EOF before the parser gives up.
+MAX_ENTRY_BYTES = 32 * 1024 * 1024
+COMMAND_UPDATE_FIELDS = ['description', 'template', 'category', 'tags', 'updated_at']
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def parse_tags(raw):
+    if isinstance(raw, list):
+        return [str(item).strip() for item in raw if str(item).strip()]
+    if not raw:
+        return []
+    return [tag.strip() for tag in str(raw).split(',') if tag.strip()]
+
+
+def _export_tools(chunk_size: int = EXPORT_CHUNK_SIZE):
+    commands = CommandTemplate.objects.only(
+        'tool_id', 'name', 'description', 'template', 'category', 'tags'
+    )
+    tools = Tool.objects.only('name', 'description').prefetch_related(
+        Prefetch('commands', queryset=commands)
+    )
+    # iterator() with a chunk_size runs the prefetch per chunk, so only
+    # chunk_size tools and their commands are held in memory at a time.
+    for tool in tools.iterator(chunk_size=chunk_size):
+        yield {
+            'name': tool.name,
+            'description': tool.description,
+            'commands': [
+                {
+                    'name': command.name,
+                    'description': command.description,
+                    'template': command.template,
+                    'category': command.category,
+                    'tags': command.tags,
+                }
+                for command in tool.commands.all()
+            ],
+        }
+
+
+def _iter_export_parts(compact: bool):
+    # Emits exactly what json.dumps({'tools': [...]}, indent=2) would (or the
+    # compact equivalent), one tool at a time.
+    if compact:
+        yield '{"tools":['
+        separator = ''
+        for tool in _export_tools():
+            yield separator
+            yield json.dumps(tool, cls=DjangoJSONEncoder, separators=(',', ':'))
+            separator = ','
+        yield ']}'
+        return
+
+    first = True
+    for tool in _export_tools():
+        encoded = json.dumps(tool, cls=DjangoJSONEncoder, indent=2)
+        yield '{\n  "tools": [\n    ' if first else ',\n    '
+        yield encoded.replace('\n', '\n    ')
+        first = False
+    yield '{\n  "tools": []\n}' if first else '\n  ]\n}'
+
+
+def buffered_chunks(parts, size: int = STREAM_BUFFER_SIZE):
+    buffer = []
+    buffered = 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield ''.join(buffer).encode()
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(compact: bool = False, gzip: bool = False):
+    chunks = buffered_chunks(_iter_export_parts(compact))
+    return _gzipped(chunks) if gzip else chunks
+
+
+@dataclass
+class ImportResult:
+    tools_processed: int = 0
+    commands_processed: int = 0
+    created_tools: int = 0
+    created_commands: int = 0
+    updated_commands: int = 0
+
+
+def _clean_commands(commands):
+    cleaned = []
+    for cmd_entry in commands:
+        if not isinstance(cmd_entry, dict):
+            continue
+        name = str(cmd_entry.get('name', '')).strip()
+        template = str(cmd_entry.get('template', '')).strip()
+        if not name or not template:
+            continue
+        cleaned.append(
+            {
+                'name': name,
+                'template': template,
+                'description': str(cmd_entry.get('description', '') or '').strip(),
+                'category': str(cmd_entry.get('category', '') or '').strip(),
+                'tags': parse_tags(cmd_entry.get('tags', [])),
+            }
+        )
+    return cleaned
+
+
+def clean_tool_entry(tool_entry):
+    if not isinstance(tool_entry, dict):
+        return None
+    name = str(tool_entry.get('name', '')).strip()
+    if not name:
+        return None
+    commands = tool_entry.get('commands', [])
+    return {
+        'name': name,
+        'description': str(tool_entry.get('description', '') or '').strip(),
+        'commands': _clean_commands(commands) if isinstance(commands, list) else [],
+    }
+
+
+def _apply_tools(entries, overwrite, result, now):
+    names = list(dict.fromkeys(entry['name'] for entry in entries))
+    tools = {tool.name: tool for tool in Tool.objects.filter(name__in=names)}
+    new_tools = {}
+    changed_tools = {}
+    for entry in entries:
+        name = entry['name']
+        description = entry['description']
+        tool = tools.get(name) or new_tools.get(name)
+        if tool is None:
+            new_tools[name] = Tool(name=name, description=description)
+            result.created_tools += 1
+        elif overwrite and description and description != tool.description:
+            tool.description = description
+            if name in tools:
+                tool.updated_at = now
+                changed_tools[name] = tool
+
+    if new_tools:
+        # A concurrent import may create the same tool first; keep its row.
+        Tool.objects.bulk_create(new_tools.values(), batch_size=IMPORT_BATCH_SIZE, ignore_conflicts=True)
+        missing = [name for name, tool in new_tools.items() if tool.pk is None]
+        if missing:
+            # Conflict-tolerant inserts do not return ids; look them up once.
+            for name, pk in Tool.objects.filter(name__in=missing).values_list('name', 'id'):
+                new_tools[name].pk = pk
+        tools.update(new_tools)
+    if changed_tools:
+        Tool.objects.bulk_update(
+            changed_tools.values(), ['description', 'updated_at'], batch_size=IMPORT_BATCH_SIZE
+        )
+    return tools, set(new_tools)
+
+
+def _apply_commands(entries, tools, new_tool_names, overwrite, result, now):
+    existing_tool_ids = [tools[name].pk for name in tools if name not in new_tool_names]
+    # (tool_id, name) -> category, for the stats deltas of rewritten rows.
+    existing = {
+        (tool_id, name): category
+        for tool_id, name, category in CommandTemplate.objects.filter(tool_id__in=existing_tool_ids).values_list(
+            'tool_id', 'name', 'category'
+        )
+    }
+    rows = {}
+    tool_commands = Counter()
+    categories = Counter()
+    for entry in entries:
+        tool_id = tools[entry['name']].pk
+        for cmd in entry['commands']:
+            key = (tool_id, cmd['name'])
+            if key in existing or key in rows:
+                if overwrite:
+                    previous = rows[key]['category'] if key in rows else existing[key]
+                    categories[previous] -= 1
+                    categories[cmd['category']] += 1
+                    rows[key] = cmd
+                    result.updated_commands += 1
+            else:
+                rows[key] = cmd
+                result.created_commands += 1
+                tool_commands[tool_id] += 1
+                categories[cmd['category']] += 1
+    if not rows:
+        return
+    if overwrite:
+        # One upsert keyed on (tool, name) both creates new rows and rewrites
+        # existing ones; bulk_update's per-row CASE WHEN is far slower here.
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in COMMAND_UPDATE_FIELDS)
+        conflict = f'ON CONFLICT (tool_id, name) DO UPDATE SET {assignments}'
+    else:
+        # Only rows created by a concurrent writer can conflict; leave them be.
+        conflict = 'ON CONFLICT (tool_id, name) DO NOTHING'
+    ops = connection.ops
+    stamp = ops.adapt_datetimefield_value(now)
+    # RETURNING reports exactly the rows this statement wrote, so the
+    # placeholder and tag indexes are fed from the incoming entries.
+    written = insert_rows(
+        CommandTemplate,
+        ('tool_id', 'name', 'description', 'template', 'category', 'tags', 'created_at', 'updated_at'),
+        (
+            (
+                tool_id,
+                name,
+                cmd['description'],
+                cmd['template'],
+                cmd['category'],
+                ops.adapt_json_value(cmd['tags'], None),
+                stamp,
+                stamp,
+            )
+            for (tool_id, name), cmd in rows.items()
+        ),
+        conflict=conflict,
+        returning=('id', 'tool_id', 'name'),
+    )
+    # Rows new to the catalog have no placeholders or tag links to replace.
+    fresh, rewritten = [], []
+    for pk, tool_id, name in written:
+        (rewritten if (tool_id, name) in existing else fresh).append((pk, rows[(tool_id, name)]))
+    for batch, is_fresh in ((fresh, True), (rewritten, False)):
+        sync_placeholders(((pk, cmd['template']) for pk, cmd in batch), fresh=is_fresh)
+        sync_tags(((pk, cmd['tags']) for pk, cmd in batch), fresh=is_fresh)
+    # Bulk writes bypass model signals, so shift the stats here.
+    apply_stats_delta(
+        commands=sum(tool_commands.values()),
+        tool_commands=tool_commands,
+        categories=categories,
+        refresh_latest=True,
+    )
+
+
+def _import_batch(entries, overwrite, result):
+    now = timezone.now()
+    tools, new_tool_names = _apply_tools(entries, overwrite, result, now)
+    if new_tool_names:
+        apply_stats_delta(tools=len(new_tool_names))
+    _apply_commands(entries, tools, new_tool_names, overwrite, result, now)
+    result.tools_processed += len(entries)
+    result.commands_processed += sum(len(entry['commands']) for entry in entries)
+    # Bulk writes bypass model signals, so invalidate the catalog explicitly.
+    transaction.on_commit(catalog.bump_version)
+
+
+def import_tools(tools_data, overwrite: bool = False) -> ImportResult:
+    """Merge a list of tool entries into the catalog with set-based queries.
+
+    Counts match the historical per-row get_or_create importer. The caller
+    owns the surrounding transaction.
+    """
+    result = ImportResult()
+    entries = [entry for entry in map(clean_tool_entry, tools_data) if entry]
+    if entries:
+        _import_batch(entries, overwrite, result)
+    return result
+
+
+def import_tool_stream(
+    tool_entries,
+    overwrite: bool = False,
+    result: ImportResult | None = None,
+    batch_size: int = IMPORT_STREAM_BATCH,
+    on_batch=None,
+) -> ImportResult:
+    """Import an iterable of tool entries, committing every ``batch_size`` commands.
+
+    Only one batch is held in memory. Batches committed before an error stay
+    committed; pass ``result`` to keep their counts when the stream fails.
+    ``on_batch(result)`` is called after each commit.
+    """
+    result = result if result is not None else ImportResult()
+    batch = []
+    pending = 0
+    for raw_entry in tool_entries:
+        entry = clean_tool_entry(raw_entry)
+        if entry is None:
+            continue
+        batch.append(entry)
+        pending += len(entry['commands']) + 1
+        if pending >= batch_size:
+            with transaction.atomic():
+                _import_batch(batch, overwrite, result)
+            if on_batch is not None:
+                on_batch(result)
+            batch = []
+            pending = 0
+    if batch:
+        with transaction.atomic():
+            _import_batch(batch, overwrite, result)
+        if on_batch is not None:
+            on_batch(result)
+    return result
+
+
+class _JsonStream:
+    """Pull complete JSON values off a text stream without reading it whole."""
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = READ_CHUNK_SIZE) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > READ_CHUNK_SIZE:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ImportFormatError(f'Malformed JSON bundle: expected "{char}".')
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                pending = len(self._buffer) - self._pos
+                if pending > MAX_ENTRY_BYTES:
+                    raise ImportFormatError(
+                        f'Malformed JSON bundle: an entry is invalid or larger than {MAX_ENTRY_BYTES} bytes.'
+                    ) from None
+                # Grow reads geometrically so a huge value is not re-parsed per chunk.
+                if not self._fill(min(max(READ_CHUNK_SIZE, pending), MAX_ENTRY_BYTES + 1 - pending)):
+                    raise
+                continue
+            if end == len(self._buffer) and self._fill():
+                # A scalar at the end of the buffer may continue in the next chunk.
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ImportFormatError('Malformed JSON bundle: expected "," or "]".')
+
+    def iter_object_entries(self):
+        # Either a { "tools": [...] } bundle, streamed tool by tool, or a single
+        # tool object such as one line of an NDJSON upload.
+        self.expect('{')
+        fields = {}
+        has_tools = False
+        if self.peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise ImportFormatError('Malformed JSON bundle: object keys must be strings.')
+                self.expect(':')
+                if key == 'tools' and self.peek() == '[':
+                    has_tools = True
+                    yield from self.iter_array()
+                else:
+                    fields[key] = self.value()
+                separator = self.peek()
+                self._pos += 1
+                if separator == '}':
+                    break
+                if separator != ',':
+                    raise ImportFormatError('Malformed JSON bundle: expected "," or "}".')
+        if not has_tools:
+            if 'tools' in fields:
+                raise ImportFormatError('JSON must be a list of tools or a { "tools": [...] } object.')
+            yield fields
+
+
+def open_bundle(fileobj):
+    """Wrap an uploaded binary file as text, transparently gunzipping it."""
+    head = fileobj.read(2)
+    fileobj.seek(0)
+    if head == b'\x1f\x8b':
+        fileobj = gzip_module.GzipFile(fileobj=fileobj, mode='rb')
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig')
+
+
+def iter_bundle_entries(stream):
+    """Yield tool entries from a JSON bundle, a JSON list or NDJSON text."""
+    reader = _JsonStream(stream)
+    while True:
+        char = reader.peek()
+        if not char:
+            return
+        if char == '[':
+            yield from reader.iter_array()
+        elif char == '{':
+            yield from reader.iter_object_entries()
+        else:
+            raise ImportFormatError('JSON must be a list of tools or a { "tools": [...] } object.')
@@ -1,6 +1,17 @@
 from django.urls import path
 
-from .views import composer, export_data, import_export, library, manage, overview
+from .api import generate_commands, render_commands, tags_list, tool_commands, tools_list
+from .views import (
+    composer,
+    export_data,
+    import_export,
+    job_status,
+    library,
+    manage,
+    metrics,
+    overview,
+    search,
+)
 
 app_name = 'zxui'
 
@@ -11,4 +22,12 @@ urlpatterns = [
     path('manage/', manage, name='manage'),
     path('import/', import_export, name='import_export'),
     path('export/', export_data, name='export'),
+    path('search/', search, name='search'),
+    path('jobs/<int:job_id>/', job_status, name='job_status'),
+    path('render/', render_commands, name='render'),
+    path('generate/', generate_commands, name='generate'),
+    path('api/tools/', tools_list, name='api_tools'),
+    path('api/tools/<int:tool_id>/commands/', tool_commands, name='api_tool_commands'),
+    path('api/tags/', tags_list, name='api_tags'),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -1,90 +1,152 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+from functools import lru_cache, wraps
 
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied
 from django.db import IntegrityError, transaction
-from django.http import JsonResponse
-from django.shortcuts import redirect, render
-
-from .models import CommandTemplate, Tool
-
-
-def _parse_tags(raw):
-    if isinstance(raw, list):
-        return [str(item).strip() for item in raw if str(item).strip()]
-    if not raw:
-        return []
-    return [tag.strip() for tag in str(raw).split(',') if tag.strip()]
-
-
-def _build_tools_context():
-    tools = Tool.objects.prefetch_related('commands').all()
-    tools_payload = []
-    for tool in tools:
-        commands_payload = []
-        for cmd in tool.commands.all():
-            commands_payload.append(
-                {
-                    'id': cmd.id,
-                    'name': cmd.name,
-                    'description': cmd.description,
-                    'template': cmd.template,
-                    'category': cmd.category,
-                    'tags': cmd.tags,
-                }
-            )
-        tools_payload.append(
-            {
-                'id': tool.id,
-                'name': tool.name,
-                'description': tool.description,
-                'commands': commands_payload,
-            }
-        )
-    return tools, tools_payload
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
+from .catalog import catalog_version, command_payload, get_snapshot
+from .context_processors import dotwave_enabled
+from .jobs import is_stale, job_payload, resume_stale_jobs, submit_import
+from .metrics import registry, scrape_allowed
+from .models import CommandTemplate, ImportJob, Tool
+from .search import search_commands
+from .stats import get_stats
+from .transfer import import_tools, iter_export, parse_tags
 
-def overview(request):
-    tools = Tool.objects.prefetch_related('commands').all()
-    command_count = CommandTemplate.objects.count()
-    category_count = (
-        CommandTemplate.objects.exclude(category='')
-        .values_list('category', flat=True)
-        .distinct()
-        .count()
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 200
+
+
+def _parse_limit(raw, default, maximum):
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(value, maximum))
+
+
+def _request_catalog_version(request):
+    if not hasattr(request, '_zx_catalog_version'):
+        request._zx_catalog_version = catalog_version()
+    return request._zx_catalog_version
+
+
+@lru_cache(maxsize=None)
+def build_id() -> str:
+    """Identify the deployed code so a redeploy never revalidates stale pages.
+
+    ZX_BUILD_ID wins when set; otherwise the static manifest (hashed asset
+    names) and the template files' sizes and mtimes are hashed once per process.
+    """
+    if settings.ZX_BUILD_ID:
+        return settings.ZX_BUILD_ID
+    digest = hashlib.sha1()
+    for name, hashed in sorted(getattr(staticfiles_storage, 'hashed_files', {}).items()):
+        digest.update(f'{name}={hashed};'.encode())
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in sorted(os.walk(directory)):
+            for filename in sorted(files):
+                stat = os.stat(os.path.join(root, filename))
+                digest.update(f'{root}/{filename}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _catalog_etag(request, *args, **kwargs):
+    # Pending flash messages are rendered into the page, so never answer 304 then.
+    if len(messages.get_messages(request)):
+        return None
+    version = _request_catalog_version(request)
+    variant = (
+        f'{build_id()}|{request.get_full_path()}|{settings.ZX_COMPOSER_LAZY}|'
+        f'{settings.ZX_LIBRARY_VIRTUAL}|{dotwave_enabled(request)}'
     )
-    latest_command = CommandTemplate.objects.order_by('-updated_at').first()
+    digest = hashlib.sha1(f'{variant}|{version.token}'.encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def catalog_conditional(view):
+    """Answer 304 while the catalog is unchanged.
+
+    Only the ETag is used for validation: deleting the newest row lowers the
+    newest updated_at, so If-Modified-Since alone could wrongly report
+    "not modified". Last-Modified is still sent for information.
+    """
+    conditional_view = condition(etag_func=_catalog_etag)(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        # Revalidate every time instead of letting browsers cache heuristically.
+        patch_cache_control(response, no_cache=True)
+        version = getattr(request, '_zx_catalog_version', None)
+        if version is not None and version.last_modified and response.status_code in (200, 304):
+            response.headers.setdefault('Last-Modified', http_date(version.last_modified.timestamp()))
+        return response
+
+    return wrapped
+
+
+def _build_tools_context(request, include_commands=True):
+    snapshot = get_snapshot(_request_catalog_version(request).token)
+    if not include_commands:
+        return snapshot.tools_payload, snapshot.tool_list_script
+    return snapshot.tools_payload, snapshot.tools_script
+
+
+def overview(request):
+    stats = get_stats()
     context = {
         'active_page': 'overview',
         'page_title': 'Overview',
-        'tool_count': tools.count(),
-        'command_count': command_count,
-        'category_count': category_count,
-        'latest_command': latest_command,
-        'recent_tools': tools[:5],
+        'tool_count': stats.tool_count,
+        'command_count': stats.command_count,
+        'category_count': stats.category_count,
+        'latest_command': stats.latest_command,
+        'recent_tools': Tool.objects.all()[:5],
     }
     return render(request, 'zxui/overview.html', context)
 
 
+@catalog_conditional
 def composer(request):
-    tools, tools_payload = _build_tools_context()
+    lazy = settings.ZX_COMPOSER_LAZY
+    tools, tools_script = _build_tools_context(request, include_commands=not lazy)
     context = {
         'active_page': 'composer',
         'page_title': 'Composer',
         'tools': tools,
-        'tools_payload': tools_payload,
+        'tools_script': tools_script,
+        'composer_lazy': lazy,
     }
     return render(request, 'zxui/composer.html', context)
 
 
+@catalog_conditional
 def library(request):
-    tools, tools_payload = _build_tools_context()
+    snapshot = get_snapshot(_request_catalog_version(request).token)
+    tools = snapshot.tools_payload
     context = {
         'active_page': 'library',
         'page_title': 'Library',
         'tools': tools,
-        'tools_payload': tools_payload,
+        # Server-rendered cards are cached per tool under its fingerprint.
+        'tool_cards': [(tool, snapshot.tool_fingerprints[tool['id']]) for tool in tools],
+        'tools_script': snapshot.tools_script,
+        'library_virtual': settings.ZX_LIBRARY_VIRTUAL,
+        'tag_facets': snapshot.tag_facets,
     }
     return render(request, 'zxui/library.html', context)
 
@@ -120,7 +182,7 @@ def manage(request):
             description = request.POST.get('description', '').strip()
             template = request.POST.get('template', '').strip()
             category = request.POST.get('category', '').strip()
-            tags = _parse_tags(request.POST.get('tags', ''))
+            tags = parse_tags(request.POST.get('tags', ''))
             tool = Tool.objects.filter(id=tool_id).first() if tool_id else None
             if not tool:
                 messages.error(request, 'Select a tool for the command.')
@@ -150,7 +212,7 @@ def manage(request):
             description = request.POST.get('description', '').strip()
             template = request.POST.get('template', '').strip()
             category = request.POST.get('category', '').strip()
-            tags = _parse_tags(request.POST.get('tags', ''))
+            tags = parse_tags(request.POST.get('tags', ''))
             command = CommandTemplate.objects.filter(id=command_id).first() if command_id else None
             tool = Tool.objects.filter(id=tool_id).first() if tool_id else None
             if not command:
@@ -177,24 +239,36 @@ def manage(request):
                 messages.success(request, f'Command "{name}" updated.')
             return redirect('zxui:manage')
 
-    tools, tools_payload = _build_tools_context()
+    tools, tools_script = _build_tools_context(request)
     context = {
         'active_page': 'manage',
         'page_title': 'Manage',
         'tools': tools,
-        'tools_payload': tools_payload,
+        'tools_script': tools_script,
     }
     return render(request, 'zxui/manage.html', context)
 
 
+def _import_upload(request, upload, overwrite):
+    job = submit_import(upload, overwrite=overwrite)
+    status_url = reverse('zxui:job_status', args=[job.pk])
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'job_id': job.pk, 'status_url': status_url}, status=202)
+    messages.info(request, f'Import of "{job.source_name}" queued as job #{job.pk}.')
+    return redirect('zxui:import_export')
+
+
 def import_export(request):
     if request.method == 'POST':
         action = request.POST.get('action', '')
         if action == 'import_data':
             payload = request.POST.get('payload', '').strip()
             overwrite = request.POST.get('overwrite') == 'on'
+            upload = request.FILES.get('bundle')
+            if upload is not None:
+                return _import_upload(request, upload, overwrite)
             if not payload:
-                messages.error(request, 'Paste JSON data to import.')
+                messages.error(request, 'Paste JSON data or choose a bundle file to import.')
                 return redirect('zxui:import_export')
             try:
                 data = json.loads(payload)
@@ -206,97 +280,64 @@ def import_export(request):
                 messages.error(request, 'JSON must be a list of tools or a { "tools": [...] } object.')
                 return redirect('zxui:import_export')
 
-            created_tools = 0
-            created_commands = 0
-            updated_commands = 0
-
             with transaction.atomic():
-                for tool_entry in tools_data:
-                    if not isinstance(tool_entry, dict):
-                        continue
-                    name = str(tool_entry.get('name', '')).strip()
-                    if not name:
-                        continue
-                    description = str(tool_entry.get('description', '') or '').strip()
-                    tool, created = Tool.objects.get_or_create(
-                        name=name,
-                        defaults={'description': description},
-                    )
-                    if created:
-                        created_tools += 1
-                    elif overwrite and description and description != tool.description:
-                        tool.description = description
-                        tool.save(update_fields=['description', 'updated_at'])
-
-                    commands = tool_entry.get('commands', [])
-                    if not isinstance(commands, list):
-                        continue
-                    for cmd_entry in commands:
-                        if not isinstance(cmd_entry, dict):
-                            continue
-                        cmd_name = str(cmd_entry.get('name', '')).strip()
-                        template = str(cmd_entry.get('template', '')).strip()
-                        if not cmd_name or not template:
-                            continue
-                        cmd_description = str(cmd_entry.get('description', '') or '').strip()
-                        category = str(cmd_entry.get('category', '') or '').strip()
-                        tags = _parse_tags(cmd_entry.get('tags', []))
-
-                        command, created = CommandTemplate.objects.get_or_create(
-                            tool=tool,
-                            name=cmd_name,
-                            defaults={
-                                'description': cmd_description,
-                                'template': template,
-                                'category': category,
-                                'tags': tags,
-                            },
-                        )
-                        if created:
-                            created_commands += 1
-                        elif overwrite:
-                            command.description = cmd_description
-                            command.template = template
-                            command.category = category
-                            command.tags = tags
-                            command.save(
-                                update_fields=['description', 'template', 'category', 'tags', 'updated_at']
-                            )
-                            updated_commands += 1
+                result = import_tools(tools_data, overwrite=overwrite)
 
             messages.success(
                 request,
-                f'Import complete: {created_tools} tools, {created_commands} commands, '
-                f'{updated_commands} updated.',
+                f'Import complete: {result.created_tools} tools, {result.created_commands} commands, '
+                f'{result.updated_commands} updated.',
             )
             return redirect('zxui:import_export')
 
     context = {
         'active_page': 'import_export',
         'page_title': 'Import & Export',
+        'recent_jobs': ImportJob.objects.all()[:5],
     }
     return render(request, 'zxui/import_export.html', context)
 
 
+@catalog_conditional
 def export_data(request):
-    tools = Tool.objects.prefetch_related('commands').all()
-    payload = {
-        'tools': [
-            {
-                'name': tool.name,
-                'description': tool.description,
-                'commands': [
-                    {
-                        'name': command.name,
-                        'description': command.description,
-                        'template': command.template,
-                        'category': command.category,
-                        'tags': command.tags,
-                    }
-                    for command in tool.commands.all()
-                ],
-            }
-            for tool in tools
-        ]
-    }
-    return JsonResponse(payload, json_dumps_params={'indent': 2})
+    compact = request.GET.get('compact') == '1'
+    gzip = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        iter_export(compact=compact, gzip=gzip),
+        content_type='application/gzip' if gzip else 'application/json',
+    )
+    if gzip:
+        response['Content-Disposition'] = 'attachment; filename="zx9999-export.json.gz"'
+    return response
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    limit = _parse_limit(request.GET.get('limit'), SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)
+    results = []
+    for command in search_commands(query, limit):
+        entry = command_payload(command)
+        entry['tool_id'] = command.tool_id
+        entry['tool_name'] = command.tool.name
+        results.append(entry)
+    return JsonResponse({'query': query, 'results': results})
+
+
+def job_status(request, job_id):
+    job = get_object_or_404(ImportJob, pk=job_id)
+    if is_stale(job):
+        # The worker that owned it is gone; requeue it here instead of
+        # letting the page poll forever.
+        resume_stale_jobs()
+        job.refresh_from_db()
+    return JsonResponse(job_payload(job))
+
+
+def metrics(request):
+    if not settings.ZX_METRICS:
+        raise Http404
+    if not scrape_allowed(request):
+        raise PermissionDenied
+    # Without ZX_METRICS_DIR these are only the counters of the worker that answered.
+    body = registry.render(settings.ZX_METRICS_DIR or None)
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')